@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 from fastapi import status
 from fastapi import Response, Depends
+from fastapi import Request
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.models import dto
-from app.services import user
+from app.services import user as user_service
+from app.services import job as job_service
 from app.core.security import session
 from app.core import dependencies
 
@@ -20,11 +22,11 @@ router = APIRouter(
 )
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=dto.ApiResponse)
-async def register(user: dto.UserCreateDTO):
+async def register(user: dto.UserCreateDTO, db: dependencies.async_db_dependency):
     try:
-        created_user = user_service.create_user(user)
+        created_user = await user_service.create_user_async(db, user)
         return ApiResponse.success(
-            data=created_user.model_dump(),
+            data=created_user,
             message="Đăng ký thành công",
             status=status.HTTP_201_CREATED,
         )
@@ -32,7 +34,7 @@ async def register(user: dto.UserCreateDTO):
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.post("/login", status_code=status.HTTP_200_OK, response_model=dto.ApiResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), res: Response = None):
+async def login(req: Request, db: dependencies.async_read_db_dependency, form_data: OAuth2PasswordRequestForm = Depends(), res: Response = None):
     """
     OAuth2 password flow login.
     Swagger/OAuth2PasswordBearer sẽ gửi username/password dạng form-data.
@@ -42,7 +44,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), res: Response
             email=form_data.username,
             password=form_data.password,
         )
-        token = await session.login(credentials, res)
+        token = await session.login(db, credentials, res, ip=req.client.host if req.client else None)
         return ApiResponse.success(
             data={"access_token": token, "token_type": "bearer"},
             message="Đăng nhập thành công",
@@ -61,22 +63,27 @@ async def logout(res: Response):
 @router.get("/validate", response_model=dto.ApiResponse)
 async def check_session(token: dependencies.token_dependency):
     try:
-        return ApiResponse.success(data=token.model_dump(), message="Token hợp lệ")
+        return ApiResponse.success(data=token, message="Token hợp lệ")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.put("/password/update", status_code=status.HTTP_200_OK, response_model=dto.ApiResponse)
-def update_password(dto: dto.UserUpdatePassDTO, user: dependencies.user_dependency):
+def update_password(dto: dto.UserUpdatePassDTO, user: dependencies.user_dependency, db: dependencies.db_dependency):
     try:
-        user_service.update_password(user, dto)
+        user_service.update_password(db, user, dto)
         return ApiResponse.success(message="Đổi mật khẩu thành công")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
-@router.post("/password/reset", status_code=status.HTTP_200_OK, response_model=dto.ApiResponse)
-def reset_password(email: str):
+@router.post("/password/reset", status_code=status.HTTP_202_ACCEPTED, response_model=dto.ApiResponse)
+def reset_password(email: str, db: dependencies.db_dependency):
+    """Hashing the new password is slow: queued as a background job, answered with its id."""
     try:
-        user_service.reset_password(email)
-        return ApiResponse.success(message="Đặt lại mật khẩu thành công")
+        job = job_service.submit(db, "user.reset_password", {"email": email}, priority=5)
+        return ApiResponse.success(
+            data={"job_id": job.id},
+            message="Đã nhận yêu cầu đặt lại mật khẩu",
+            status=status.HTTP_202_ACCEPTED,
+        )
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
\ No newline at end of file
@@ -0,0 +1,64 @@
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Path
+
+from app.models import dto
+from app.models import enums
+from app.services import employee as employee_service
+from app.services import skill as skill_service
+from app.core import dependencies
+from app.utils.api_response import ApiResponse
+from app.utils.api_exception import ApiException
+
+
+router = APIRouter(
+    prefix="/employee",
+    tags=["Employees"]
+)
+
+
+@router.get("/all", response_model=dto.ApiResponse)
+def get_all(
+    user: dependencies.user_dependency,
+    db: dependencies.read_db_dependency,
+    limit: int = Query(100, gt=0),
+    cursor: str | None = Query(None, description="next_cursor của trang trước"),
+    department: str | None = Query(None),
+    position: str | None = Query(None),
+):
+    try:
+        employees, next_cursor = employee_service.get_page(db, cursor, limit, department, position)
+        return ApiResponse.success(data=employees, message="Danh sách nhân viên", next_cursor=next_cursor)
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/match", response_model=dto.ApiResponse)
+def match_skills(
+    user: dependencies.user_dependency,
+    db: dependencies.read_db_dependency,
+    skill_ids: list[int] = Query(..., description="id của các kỹ năng"),
+    mode: enums.SkillMatch = Query(enums.SkillMatch.ALL),
+    limit: int = Query(100, gt=0),
+    cursor: str | None = Query(None, description="next_cursor của trang trước"),
+):
+    try:
+        employees, next_cursor = employee_service.match_skills(db, skill_ids, mode, cursor, limit)
+        return ApiResponse.success(data=employees, message="Danh sách nhân viên phù hợp", next_cursor=next_cursor)
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.post("/skills", response_model=dto.ApiResponse)
+def assign_skills(admin: dependencies.admin_dependency, db: dependencies.db_dependency, obj: dto.SkillAssignDTO):
+    try:
+        report = skill_service.assign_many(db, obj)
+        return ApiResponse.success(data=report, message="Gán kỹ năng thành công")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/{id}", response_model=dto.ApiResponse)
+def get_by_id(user: dependencies.user_dependency, db: dependencies.read_db_dependency, id: int = Path(ge=1)):
+    try:
+        employee = employee_service.get_by_id(db, id)
+        return ApiResponse.success(data=employee, message="Lấy nhân viên thành công")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi import status
+
+from app.models import dto
+from app.core import warmup
+from app.utils.api_response import ApiResponse
+
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"]
+)
+
+@router.get("/live", response_model=dto.ApiResponse)
+async def live():
+    return ApiResponse.success(message="OK")
+
+@router.get("/ready", response_model=dto.ApiResponse)
+async def ready():
+    """Ready only once the startup warm-up has finished."""
+    if not warmup.readiness.ready:
+        return ApiResponse.error(
+            message=warmup.readiness.error or "Warming up",
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return ApiResponse.success(message="Ready")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi import status
+from fastapi import Path
+
+from app.models import dto
+from app.services import job as job_service
+from app.core import dependencies
+from app.utils.api_response import ApiResponse
+from app.utils.api_exception import ApiException
+
+
+router = APIRouter(
+    prefix="/job",
+    tags=["Jobs"]
+)
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED, response_model=dto.ApiResponse)
+def submit(admin: dependencies.admin_dependency, db: dependencies.db_dependency, obj: dto.JobSubmitDTO):
+    try:
+        job = job_service.submit(db, obj.name, obj.args, obj.priority, admin.id)
+        return ApiResponse.success(data=job, message="Đã nhận công việc", status=status.HTTP_202_ACCEPTED)
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/{id}", response_model=dto.ApiResponse)
+def get_status(user: dependencies.user_dependency, db: dependencies.read_db_dependency, id: str = Path(max_length=32)):
+    try:
+        job = job_service.get(db, id, user)
+        return ApiResponse.success(data=job, message="Trạng thái công việc")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
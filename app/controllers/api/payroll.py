@@ -0,0 +1,108 @@
+from datetime import date
+
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Path
+from starlette import status
+
+from app.models import dto
+from app.services import payroll as payroll_service
+from app.services import payroll_analytics
+from app.services import payroll_run as payroll_run_service
+from app.core import dependencies
+from app.utils.api_response import ApiResponse
+from app.utils.api_exception import ApiException
+
+
+router = APIRouter(
+    prefix="/payroll",
+    tags=["Payroll"]
+)
+
+
+@router.get("/report", response_model=dto.ApiResponse)
+def get_report(
+    admin: dependencies.admin_dependency,
+    db: dependencies.read_db_dependency,
+    start: date | None = Query(None, description="tháng bắt đầu (ngày bất kỳ trong tháng)"),
+    end: date | None = Query(None, description="tháng kết thúc, tính cả tháng này"),
+    department: str | None = Query(None),
+):
+    """Monthly totals per department, read from the payroll summary."""
+    try:
+        report = payroll_service.get_department_report(db, start, end, department)
+        return ApiResponse.success(data=report, message="Báo cáo lương theo phòng ban")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/analytics", response_model=dto.ApiResponse)
+def get_analytics(
+    admin: dependencies.admin_dependency,
+    db: dependencies.read_db_dependency,
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    department: str | None = Query(None),
+    bins: int = Query(10, ge=1, le=100, description="số cột của histogram lương theo giờ"),
+):
+    """Percentiles, hourly-rate histogram and month-over-month deltas per department."""
+    try:
+        stats = payroll_analytics.get_department_stats(db, start, end, department, bins)
+        return ApiResponse.success(data=stats, message="Phân tích lương theo phòng ban")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/user/{user_id}", response_model=dto.ApiResponse)
+def get_user_months(
+    admin: dependencies.admin_dependency,
+    db: dependencies.read_db_dependency,
+    user_id: int = Path(ge=1),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+):
+    try:
+        months = payroll_service.get_user_months(db, user_id, start, end)
+        return ApiResponse.success(data=months, message="Lương theo tháng")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.post("/runs", response_model=dto.ApiResponse)
+def start_run(
+    admin: dependencies.admin_dependency,
+    db: dependencies.db_dependency,
+    month: date = Query(..., description="tháng tính lương (ngày bất kỳ trong tháng)"),
+):
+    """Starts a batch net-pay run in the background, poll GET /runs/{id} for progress."""
+    try:
+        run = payroll_run_service.start(db, month)
+        return ApiResponse.success(data=run, message="Đã bắt đầu tính lương")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/runs/{id}", response_model=dto.ApiResponse)
+def get_run(admin: dependencies.admin_dependency, db: dependencies.read_db_dependency, id: int = Path(ge=1)):
+    try:
+        run = payroll_run_service.get(db, id)
+        return ApiResponse.success(data=run, message="Trạng thái tính lương")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.post("/runs/{id}/resume", response_model=dto.ApiResponse)
+def resume_run(admin: dependencies.admin_dependency, db: dependencies.db_dependency, id: int = Path(ge=1)):
+    try:
+        run = payroll_run_service.resume(db, id)
+        return ApiResponse.success(data=run, message="Tiếp tục tính lương")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.post("/refresh", status_code=status.HTTP_202_ACCEPTED, response_model=dto.ApiResponse)
+def refresh(admin: dependencies.admin_dependency, db: dependencies.db_dependency, full: bool = Query(False)):
+    """Queued with the recurring refresh, so the two never run at once; poll GET /api/job/{id}."""
+    try:
+        job = payroll_service.submit_refresh(db, full, admin.id)
+        return ApiResponse.success(
+            data={"job_id": job.id},
+            message="Đã nhận yêu cầu cập nhật bảng tổng hợp lương",
+            status=status.HTTP_202_ACCEPTED,
+        )
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
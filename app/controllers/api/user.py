@@ -8,7 +8,8 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from starlette.responses import JSONResponse, StreamingResponse
 
 from app.models import dto
-from app.services import user
+from app.models import enums
+from app.services import user as user_service
 from app.core import dependencies
 from app.utils.api_response import ApiResponse
 from app.utils.api_exception import ApiException
@@ -26,39 +27,77 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 @router.get("/me", response_model=dto.ApiResponse)
 def get_me(user: dependencies.user_dependency, token: str = Depends(oauth2_scheme)) -> JSONResponse:
     try:
-        return ApiResponse.success(data=user.model_dump(), message="Lấy thông tin tài khoản thành công")
+        return ApiResponse.success(data=user, message="Lấy thông tin tài khoản thành công")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.get("/all", response_model=dto.ApiResponse)
-def get_all(limit: int = Query(1000, gt=0), offset: int = Query(0, ge=0)):
+def get_all(
+    db: dependencies.read_db_dependency,
+    limit: int = Query(1000, gt=0),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor của trang trước (keyset pagination)"),
+    order_by: enums.UserOrder | None = Query(None, description="Bật keyset pagination theo cột này"),
+):
+    """
+    Offset pagination by default.
+    Passing `order_by` and/or `cursor` switches to keyset pagination, the response then carries `next_cursor`.
+    A cursor sent back alone keeps the ordering it was issued for.
+    """
     try:
-        logging.info(f"Get all {limit}/{offset}")
-        users = user_service.get_all(limit, offset)
-        payload = [user.model_dump() for user in users]
-        return ApiResponse.success(data=payload, message="Danh sách người dùng")
+        if cursor is None and order_by is None:
+            logging.info("Get all %d/%d", limit, offset)
+            users = user_service.get_all(db, limit, offset)
+            return ApiResponse.success(data=users, message="Danh sách người dùng")
+
+        users, next_cursor = user_service.get_page(db, cursor, order_by, limit)
+        return ApiResponse.success(data=users, message="Danh sách người dùng", next_cursor=next_cursor)
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.get("/admin_only", response_model=dto.ApiResponse)
 def get_admin_only(user: dependencies.admin_dependency):
     try:
-        return ApiResponse.success(data=user.model_dump(), message="Thông tin admin")
+        return ApiResponse.success(data=user, message="Thông tin admin")
+    except ApiException as e:
+        return ApiResponse.error(message=e.message, status=e.status_code)
+
+@router.get("/export")
+def export(admin: dependencies.admin_dependency, format: enums.ExportFormat = Query(enums.ExportFormat.NDJSON)):
+    """Streams every user as NDJSON or CSV with constant memory."""
+    media_type = "text/csv" if format == enums.ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        user_service.export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+@router.post("/import", response_model=dto.ApiResponse)
+async def import_users(
+    admin: dependencies.admin_dependency,
+    db: dependencies.async_db_dependency,
+    file: UploadFile = File(..., description="CSV: name,surname,email,password"),
+):
+    try:
+        report = await user_service.import_csv_async(db, file.file)
+        if report["aborted"] is not None:
+            return ApiResponse.success(data=report, message="Nhập người dùng bị dừng giữa chừng")
+        return ApiResponse.success(data=report, message="Nhập người dùng hoàn tất")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.get("/{id}", response_model=dto.ApiResponse)
-def get_by_id(id: int = Path(ge=1)):
+def get_by_id(db: dependencies.read_db_dependency, id: int = Path(ge=1)):
     try:
-        user = user_service.get_by_id_dto(id)
-        return ApiResponse.success(data=user.model_dump(), message="Lấy người dùng thành công")
+        user = user_service.get_by_id_dto(db, id)
+        return ApiResponse.success(data=user, message="Lấy người dùng thành công")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
 
 @router.get("/email/{email}", response_model=dto.ApiResponse)
-def get_by_email(email: str):
+def get_by_email(email: str, db: dependencies.read_db_dependency):
     try:
-        user = user_service.get_by_email_dto(email)
-        return ApiResponse.success(data=user.model_dump(), message="Lấy người dùng thành công")
+        user = user_service.get_by_email_dto(db, email)
+        return ApiResponse.success(data=user, message="Lấy người dùng thành công")
     except ApiException as e:
         return ApiResponse.error(message=e.message, status=e.status_code)
\ No newline at end of file
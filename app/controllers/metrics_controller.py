@@ -0,0 +1,35 @@
+import hmac
+
+from fastapi import APIRouter
+from fastapi import Header
+from fastapi.responses import PlainTextResponse
+from starlette import status
+
+from app.core import metrics
+from app.core.config import CONFIG
+
+
+router = APIRouter(
+    prefix="",
+    tags=["Metrics"]
+)
+
+
+def _authorized(authorization: str | None) -> bool:
+    if not CONFIG.METRICS_TOKEN:
+        return True
+    scheme, _, token = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), CONFIG.METRICS_TOKEN.encode())
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(authorization: str | None = Header(default=None)):
+    """
+    Prometheus text exposition format. With METRICS_TOKEN set the scraper must send
+    `Authorization: Bearer <token>`; without it the endpoint is open and has to be blocked at the proxy.
+    """
+    if not _authorized(authorization):
+        return PlainTextResponse(
+            "Unauthorized", status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"}
+        )
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,7 +3,10 @@ from fastapi.requests import Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from app.views import main_view
+from app.views import common_view
 from app.core.dependencies import user_dependency
+from app.core.dependencies import async_db_dependency
+from app.core.dependencies import async_read_db_dependency
 from app.core.security import session
 from app.models import dto
 from app.services import user as user_service
@@ -29,13 +32,14 @@ def register_get(req: Request):
 @router.post("/register")
 async def register_post(
     req: Request,
+    db: async_db_dependency,
     name: str = Form(...),
     surname: str = Form(...),
     email: str = Form(...),
     password: str = Form(...)
 ):
     """Handle registration form submission"""
-    logger.info(f"Yêu cầu đăng ký từ email: {email}")
+    logger.info("Yêu cầu đăng ký từ email: %s", email)
     try:
         user_data = dto.UserCreateDTO(
             name=name,
@@ -43,33 +47,38 @@ async def register_post(
             email=email,
             password=password
         )
-        created_user = user_service.create_user(user_data)
-        logger.info(f"Đăng ký thành công cho email: {email}")
+        created_user = await user_service.create_user_async(db, user_data)
+        logger.info("Đăng ký thành công cho email: %s", email)
         return main_view.register_page(req, success="Đăng ký thành công! Bạn có thể đăng nhập ngay.")
     except AppException as e:
-        logger.warning(f"Đăng ký thất bại cho email: {email} - Lỗi: {e.message}")
+        logger.warning("Đăng ký thất bại cho email: %s - Lỗi: %s", email, e.message)
         return main_view.register_page(req, error=e.message)
     except Exception as e:
-        logger.error(f"Lỗi không mong đợi khi đăng ký: {str(e)}")
+        logger.error("Lỗi không mong đợi khi đăng ký: %s", e)
         return main_view.register_page(req, error="Đã xảy ra lỗi. Vui lòng thử lại sau.")
 
 @router.post("/login")
 async def login_post(
     req: Request,
+    db: async_read_db_dependency,
     email: str = Form(...),
     password: str = Form(...)
 ):
     """Handle login form submission and redirect to cf.goplay.vn on success"""
-    logger.info(f"Yêu cầu đăng nhập từ email: {email}")
+    logger.info("Yêu cầu đăng nhập từ email: %s", email)
     try:
         credentials = dto.UserLoginDTO(email=email, password=password)
         # Use 303 See Other for POST redirect (more appropriate than 302)
         res = RedirectResponse(url="https://cf.goplay.vn/", status_code=303)
-        token = await session.login(credentials, res)
-        logger.info(f"Đăng nhập thành công cho email: {email} - Redirecting to https://cf.goplay.vn/")
+        token = await session.login(db, credentials, res, ip=req.client.host if req.client else None)
+        logger.info("Đăng nhập thành công cho email: %s - Redirecting to https://cf.goplay.vn/", email)
         return res
     except AppException as e:
-        logger.warning(f"Đăng nhập thất bại cho email: {email} - Lỗi: {e.message}")
+        logger.warning("Đăng nhập thất bại cho email: %s - Lỗi: %s", email, e.message)
+        if e.status_code == 429:
+            page = common_view.error_page(req, e)
+            page.status_code = e.status_code
+            return page
         # On error, redirect back to main page with error message
         # You can customize this to show error message on the login page
         return RedirectResponse(url="/", status_code=302)
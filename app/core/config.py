@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import timedelta
 from os import getenv
 import os
+import tempfile
 
 
 def _get_from_env(var_name: str) -> str:
@@ -12,12 +14,74 @@ def _get_from_env(var_name: str) -> str:
         raise ValueError(f"Environment variable '{var_name}' must be set.")
     return value
 
+# sync driver -> asyncio driver used by the AsyncEngine in db_context
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mariadb+pymysql": "mariadb+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+def _parse_mapping(value: str) -> dict[str, float]:
+    """"uvicorn.access=0.1, app=1" -> {"uvicorn.access": 0.1, "app": 1.0}"""
+    mapping = {}
+    for item in value.split(","):
+        if item.strip():
+            name, _, number = item.partition("=")
+            mapping[name.strip()] = float(number)
+    return mapping
+
 @dataclass(frozen=True)
 class Config:
     DB_CONNECTION_STRING: str
+    ASYNC_DB_CONNECTION_STRING: str
     COOKIES_KEY_NAME: str
     SESSION_TIME: timedelta
     HASH_SALT: str
+    HASH_EXECUTOR: str = "thread"  # "thread" | "process"
+    HASH_WORKERS: int = 4
+    HASH_MAX_QUEUE: int = 64
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: timedelta = timedelta(seconds=30)
+    JWT_CACHE_SIZE: int = 50000
+    JWT_NEGATIVE_CACHE_TTL: timedelta = timedelta(seconds=5)
+    MAX_PAGE_SIZE: int = 1000
+    DB_AUTO_MIGRATE: bool = False
+    WARMUP_POOL_CONNECTIONS: int = 5
+    SKILL_INDEX_CHECK_SECONDS: float = 30.0
+    JINJA_BYTECODE_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "fastapi-mvc-jinja")
+    PAGE_CACHE_SIZE: int = 256
+    PAGE_CACHE_TTL: timedelta = timedelta(seconds=1)
+    PAYROLL_REFRESH_MINUTES: int = 15
+    PAYROLL_SNAPSHOT_TTL: timedelta = timedelta(minutes=10)
+    PAYROLL_RUN_WORKERS: int = 4
+    PAYROLL_RUN_CHUNK_USERS: int = 500
+    JOBS_WORKER: bool = True
+    JOBS_WORKERS: int = 4
+    JOBS_HEAVY_WORKERS: int = 2
+    JOBS_POLL_SECONDS: float = 1.0
+    JOBS_LEASE_SECONDS: float = 60.0
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_EMAIL_PER_MINUTE: float = 2
+    LOGIN_BUCKETS_MAX: int = 100000
+    LOGIN_MAX_CONCURRENT_VERIFY: int = 4
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" | "json"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLING: dict[str, float] = field(default_factory=dict)  # logger prefix -> kept fraction below WARNING
+    LOG_RATE_LIMITS: dict[str, float] = field(default_factory=dict)  # logger prefix -> records per second
+    QUERY_LOG_MODE: str = "production"  # "off" | "production" | "development"
+    SLOW_QUERY_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10
+    METRICS_TOKEN: str = ""
 
     @staticmethod
     def get_config() -> Config:
@@ -32,12 +96,112 @@ class Config:
             raise ValueError(
                 "Environment variable 'DB_CONNECTION_STRING' must be set and cannot be empty. "
             )
+        async_db_connection_string = getenv("ASYNC_DB_CONNECTION_STRING", _to_async_url(db_connection_string))
 
         cookies_key_name = "session_token"
         session_time = timedelta(days=30)
         hash_salt = getenv("HASH_SALT", "SomeRandomStringHere")
 
-        return Config(db_connection_string, cookies_key_name, session_time, hash_salt)
+        hash_executor = getenv("HASH_EXECUTOR", "thread")
+        if hash_executor not in ("thread", "process"):
+            raise ValueError("Environment variable 'HASH_EXECUTOR' must be 'thread' or 'process'.")
+        hash_workers = int(getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+        hash_max_queue = int(getenv("HASH_MAX_QUEUE", str(hash_workers * 16)))
+
+        user_cache_size = int(getenv("USER_CACHE_SIZE", "10000"))
+        user_cache_ttl = timedelta(seconds=float(getenv("USER_CACHE_TTL_SECONDS", "30")))
+
+        jwt_cache_size = int(getenv("JWT_CACHE_SIZE", "50000"))
+        jwt_negative_cache_ttl = timedelta(seconds=float(getenv("JWT_NEGATIVE_CACHE_TTL_SECONDS", "5")))
+
+        max_page_size = int(getenv("MAX_PAGE_SIZE", "1000"))
+        db_auto_migrate = getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+        warmup_pool_connections = int(getenv("WARMUP_POOL_CONNECTIONS", "5"))
+        skill_index_check_seconds = float(getenv("SKILL_INDEX_CHECK_SECONDS", "30"))
+
+        jinja_bytecode_cache_dir = getenv(
+            "JINJA_BYTECODE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "fastapi-mvc-jinja")
+        )
+        page_cache_size = int(getenv("PAGE_CACHE_SIZE", "256"))
+        page_cache_ttl = timedelta(seconds=float(getenv("PAGE_CACHE_TTL_SECONDS", "1")))
+        payroll_refresh_minutes = int(getenv("PAYROLL_REFRESH_MINUTES", "15"))
+        payroll_snapshot_ttl = timedelta(seconds=float(getenv("PAYROLL_SNAPSHOT_TTL_SECONDS", "600")))
+        payroll_run_workers = int(getenv("PAYROLL_RUN_WORKERS", "4"))
+        payroll_run_chunk_users = int(getenv("PAYROLL_RUN_CHUNK_USERS", "500"))
+
+        jobs_worker = getenv("JOBS_WORKER", "true").lower() in ("1", "true", "yes")
+        jobs_workers = int(getenv("JOBS_WORKERS", "4"))
+        jobs_heavy_workers = int(getenv("JOBS_HEAVY_WORKERS", "2"))
+        jobs_poll_seconds = float(getenv("JOBS_POLL_SECONDS", "1"))
+        jobs_lease_seconds = float(getenv("JOBS_LEASE_SECONDS", "60"))
+
+        login_ip_burst = int(getenv("LOGIN_IP_BURST", "20"))
+        login_ip_per_minute = float(getenv("LOGIN_IP_PER_MINUTE", "10"))
+        login_email_burst = int(getenv("LOGIN_EMAIL_BURST", "5"))
+        login_email_per_minute = float(getenv("LOGIN_EMAIL_PER_MINUTE", "2"))
+        login_buckets_max = int(getenv("LOGIN_BUCKETS_MAX", "100000"))
+        login_max_concurrent_verify = int(getenv("LOGIN_MAX_CONCURRENT_VERIFY", str(hash_workers)))
+
+        log_level = getenv("LOG_LEVEL", "INFO").upper()
+        log_format = getenv("LOG_FORMAT", "text")
+        if log_format not in ("text", "json"):
+            raise ValueError("Environment variable 'LOG_FORMAT' must be 'text' or 'json'.")
+        log_queue_size = int(getenv("LOG_QUEUE_SIZE", "10000"))
+        log_sampling = _parse_mapping(getenv("LOG_SAMPLING", ""))
+        log_rate_limits = _parse_mapping(getenv("LOG_RATE_LIMITS", ""))
+
+        query_log_mode = getenv("QUERY_LOG_MODE", "production")
+        if query_log_mode not in ("off", "production", "development"):
+            raise ValueError("Environment variable 'QUERY_LOG_MODE' must be 'off', 'production' or 'development'.")
+        slow_query_ms = float(getenv("SLOW_QUERY_MS", "200"))
+        n_plus_one_threshold = int(getenv("N_PLUS_ONE_THRESHOLD", "10"))
+        metrics_token = getenv("METRICS_TOKEN", "")
+
+        return Config(
+            db_connection_string,
+            async_db_connection_string,
+            cookies_key_name,
+            session_time,
+            hash_salt,
+            HASH_EXECUTOR=hash_executor,
+            HASH_WORKERS=hash_workers,
+            HASH_MAX_QUEUE=hash_max_queue,
+            USER_CACHE_SIZE=user_cache_size,
+            USER_CACHE_TTL=user_cache_ttl,
+            JWT_CACHE_SIZE=jwt_cache_size,
+            JWT_NEGATIVE_CACHE_TTL=jwt_negative_cache_ttl,
+            MAX_PAGE_SIZE=max_page_size,
+            DB_AUTO_MIGRATE=db_auto_migrate,
+            WARMUP_POOL_CONNECTIONS=warmup_pool_connections,
+            SKILL_INDEX_CHECK_SECONDS=skill_index_check_seconds,
+            JINJA_BYTECODE_CACHE_DIR=jinja_bytecode_cache_dir,
+            PAGE_CACHE_SIZE=page_cache_size,
+            PAGE_CACHE_TTL=page_cache_ttl,
+            PAYROLL_REFRESH_MINUTES=payroll_refresh_minutes,
+            PAYROLL_SNAPSHOT_TTL=payroll_snapshot_ttl,
+            PAYROLL_RUN_WORKERS=payroll_run_workers,
+            PAYROLL_RUN_CHUNK_USERS=payroll_run_chunk_users,
+            JOBS_WORKER=jobs_worker,
+            JOBS_WORKERS=jobs_workers,
+            JOBS_HEAVY_WORKERS=jobs_heavy_workers,
+            JOBS_POLL_SECONDS=jobs_poll_seconds,
+            JOBS_LEASE_SECONDS=jobs_lease_seconds,
+            LOGIN_IP_BURST=login_ip_burst,
+            LOGIN_IP_PER_MINUTE=login_ip_per_minute,
+            LOGIN_EMAIL_BURST=login_email_burst,
+            LOGIN_EMAIL_PER_MINUTE=login_email_per_minute,
+            LOGIN_BUCKETS_MAX=login_buckets_max,
+            LOGIN_MAX_CONCURRENT_VERIFY=login_max_concurrent_verify,
+            LOG_LEVEL=log_level,
+            LOG_FORMAT=log_format,
+            LOG_QUEUE_SIZE=log_queue_size,
+            LOG_SAMPLING=log_sampling,
+            LOG_RATE_LIMITS=log_rate_limits,
+            QUERY_LOG_MODE=query_log_mode,
+            SLOW_QUERY_MS=slow_query_ms,
+            N_PLUS_ONE_THRESHOLD=n_plus_one_threshold,
+            METRICS_TOKEN=metrics_token,
+        )
 
 
 CONFIG = Config.get_config()
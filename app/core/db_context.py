@@ -1,31 +1,169 @@
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 
 from sqlalchemy import create_engine
+from sqlalchemy import inspect
+from sqlalchemy import Connection
+from sqlalchemy import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.models.db import Base
 from app.core.config import CONFIG
 
 
-engine = create_engine(CONFIG.DB_CONNECTION_STRING, echo=False, pool_pre_ping=True, pool_recycle=3600) #reconect after 1 hour
+# engine label ("sync" | "async") -> callback(seconds spent waiting for a connection), see core.metrics
+pool_wait_listeners: dict[str, Callable[[float], None]] = {}
+
+
+def _timed_pool(base: type[QueuePool], label: str) -> type[QueuePool]:
+    """
+    `base` reporting how long each checkout took: waiting for a free connection (or opening a
+    new one) plus the pre-ping. Wraps the public `Pool.connect()`, which is what the engine calls.
+    """
+
+    class TimedPool(base):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                listener = pool_wait_listeners.get(label)
+                if listener is not None:
+                    listener(time.perf_counter() - started)
+
+    return TimedPool
+
+
+def _pool_options(url: str, base: type[QueuePool], label: str) -> dict:
+    # in-memory SQLite keeps its single-connection pool
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {"poolclass": _timed_pool(base, label)}
+
+
+engine = create_engine(
+    CONFIG.DB_CONNECTION_STRING, echo=False, pool_pre_ping=True, pool_recycle=3600, #reconect after 1 hour
+    **_pool_options(CONFIG.DB_CONNECTION_STRING, QueuePool, "sync"),
+)
 session_maker = sessionmaker(bind=engine, expire_on_commit=False)
 
+# asyncio path for `async def` routes, so DB round trips don't block the event loop
+async_engine = create_async_engine(
+    CONFIG.ASYNC_DB_CONNECTION_STRING, echo=False, pool_pre_ping=True, pool_recycle=3600,
+    **_pool_options(CONFIG.ASYNC_DB_CONNECTION_STRING, AsyncAdaptedQueuePool, "async"),
+)
+async_session_maker = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+# pure reads: same pools, but Postgres transactions are started READ ONLY (no extra round trip)
+_READ_ONLY_OPTIONS = {"postgresql_readonly": True} if engine.dialect.name == "postgresql" else {}
+read_session_maker = sessionmaker(bind=engine.execution_options(**_READ_ONLY_OPTIONS), expire_on_commit=False)
+async_read_session_maker = async_sessionmaker(
+    bind=async_engine.execution_options(**_READ_ONLY_OPTIONS), expire_on_commit=False
+)
+
+
+def get_db() -> Iterator[Session]:
+    """
+    FastAPI dependency: one session per request (unit of work).
+    Services commit explicitly, anything left uncommitted is rolled back on close.
+    The connection is only checked out from the pool on first use.
+    """
+    with session_maker() as session:
+        yield session
+
+def get_read_db() -> Iterator[Session]:
+    """FastAPI dependency: one read-only session per request."""
+    with read_session_maker() as session:
+        yield session
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with async_session_maker() as session:
+        yield session
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    async with async_read_session_maker() as session:
+        yield session
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+INITIAL_REVISION = "0001"
+
+
 def create_tables() -> None:
     """
     Creates the database tables by calling `Base.metadata.create_all(engine)`.
+    Only for throwaway databases, the real schema is managed by Alembic (`upgrade_db`).
     """
     Base.metadata.create_all(engine)
 
+def _alembic_config() -> AlembicConfig:
+    config = AlembicConfig(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+def _current_revision(connection: Connection) -> str | None:
+    return MigrationContext.configure(connection).get_current_revision()
+
+def head_revision() -> str | None:
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+def upgrade_db() -> None:
+    """
+    Runs `alembic upgrade head`. Databases created by the former `create_all`
+    (tables but no alembic_version) are stamped at the initial revision first.
+    """
+    config = _alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if _current_revision(connection) is None and inspect(connection).has_table("users"):
+            command.stamp(config, INITIAL_REVISION)
+        command.upgrade(config, "head")
+
+def check_schema() -> None:
+    """
+    Startup check: compares the database revision with the migration head (one SELECT, no DDL).
+    Upgrades when DB_AUTO_MIGRATE is set, otherwise refuses to start on a stale schema.
+    """
+    with engine.connect() as connection:
+        current = _current_revision(connection)
+
+    head = head_revision()
+    if current == head:
+        return
+
+    if CONFIG.DB_AUTO_MIGRATE:
+        upgrade_db()
+        return
+
+    raise RuntimeError(
+        f"Database schema is at revision {current}, expected {head}. "
+        "Run `alembic upgrade head` (or `python -m app.db_init`)."
+    )
+
 def auto_create_db():
     """
     Automatically creates the database if it doesn't already exist.
 
     This function attempts to connect to the database engine. If an exception is raised, it means the database doesn't exist yet, so it creates the database using the connection string and database name extracted from the `CONNECTION_STRING` variable.
 
-    After creating the database, it calls the `create_db()` function to perform any additional setup or initialization for the database.
+    After creating the database, it calls `upgrade_db()` to bring the schema to the latest migration.
     """
     try:
         con = engine.connect()
-        create_tables()
         con.close()
 
     except Exception as _:
@@ -35,4 +173,4 @@ def auto_create_db():
         with tmp_engine.begin() as session:
             session.exec_driver_sql(f"CREATE DATABASE `{db_name}`")
 
-        create_tables()
+    upgrade_db()
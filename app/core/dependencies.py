@@ -1,11 +1,19 @@
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import dto
 from app.core.security import session
+from app.core import db_context
 
 
 token_dependency = Annotated[dto.Token, Depends(session.get_token)]
 user_dependency = Annotated[dto.UserDTO, Depends(session.get_user)]
-admin_dependency = Annotated[dto.UserDTO, Depends(session.get_admin)]
\ No newline at end of file
+admin_dependency = Annotated[dto.UserDTO, Depends(session.get_admin)]
+
+db_dependency = Annotated[Session, Depends(db_context.get_db)]
+read_db_dependency = Annotated[Session, Depends(db_context.get_read_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(db_context.get_async_db)]
+async_read_db_dependency = Annotated[AsyncSession, Depends(db_context.get_async_read_db)]
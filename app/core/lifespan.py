@@ -1,16 +1,36 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.core.db_context import auto_create_db
+from app.core import warmup
+from app.core import scheduler
+from app.core import logging_config
+from app.core.db_context import check_schema
+from app.core.db_context import engine
+from app.core.db_context import async_engine
+from app.core.security.hash_executor import executor as hash_executor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Provides a context manager for managing the lifespan of a FastAPI application.
+    Only the root app runs it; mounted apps share its resources.
     """
 
-    auto_create_db()
+    check_schema()
+
+    # warm up in the background: the worker is live right away, /api/health/ready turns green when done
+    warmup_task = asyncio.create_task(warmup.run())
+    scheduler.start()
 
     yield
+
+    warmup.readiness.ready = False
+    warmup_task.cancel()
+    scheduler.shutdown()
+    await async_engine.dispose()
+    engine.dispose()
+    hash_executor.shutdown()
+    logging_config.shutdown()
@@ -1,17 +1,34 @@
 """
 Logging configuration for the application.
 This module should be imported first to configure logging before uvicorn starts.
+
+Loggers only put records on a bounded in-memory queue (QueueHandler); one QueueListener
+thread formats and writes them, so a slow stdout never blocks a request. When the queue
+is full records are dropped and counted instead of waiting. Messages are merged with
+their %-args on the caller side only if the record passed sampling and rate limiting.
+
+LOG_FORMAT=json switches to one JSON object per line. Colours are used only on a TTY.
 """
+import atexit
+import json
 import logging
-import sys
 import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+
+from app.core.config import CONFIG
+from app.utils.rate_limit import TokenBuckets
+
 
 # ANSI color codes for terminal colors
 class Colors:
     """ANSI color codes for terminal output"""
     RESET = '\033[0m'
     BOLD = '\033[1m'
-    
+
     # Text colors
     BLACK = '\033[30m'
     RED = '\033[31m'
@@ -21,7 +38,7 @@ class Colors:
     MAGENTA = '\033[35m'
     CYAN = '\033[36m'
     WHITE = '\033[37m'
-    
+
     # Bright colors
     BRIGHT_RED = '\033[91m'
     BRIGHT_GREEN = '\033[92m'
@@ -33,7 +50,7 @@ class Colors:
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter that adds colors to log levels"""
-    
+
     # Color mapping for log levels
     LEVEL_COLORS = {
         'DEBUG': Colors.CYAN,
@@ -42,16 +59,120 @@ class ColoredFormatter(logging.Formatter):
         'ERROR': Colors.RED,
         'CRITICAL': Colors.BRIGHT_RED,
     }
-    
-    def format(self, record):
-        # Get the color for this log level
+
+    def formatMessage(self, record):
+        # colour a copy of the level name only: the record may be shared with other handlers
         level_color = self.LEVEL_COLORS.get(record.levelname, Colors.WHITE)
-        
-        # Colorize the level name
-        record.levelname = f"{level_color}{record.levelname}{Colors.RESET}"
-        
-        # Format the message
-        return super().format(record)
+        values = dict(record.__dict__, levelname=f"{level_color}{record.levelname}{Colors.RESET}")
+        return self._style._fmt % values
+
+
+# attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, `extra=` fields, exception."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _match(mapping: dict, name: str):
+    """Value for the most specific logger prefix of `name` in `mapping` ("app" matches "app.x.y")."""
+    while True:
+        if name in mapping:
+            return mapping[name]
+        if "." not in name:
+            return mapping.get("")
+        name = name.rsplit(".", 1)[0]
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below WARNING, per logger (LOG_SAMPLING)."""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _match(self.rates, record.name)
+        if rate is None or rate >= 1 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    At most N records below WARNING per second per logger (LOG_RATE_LIMITS), with a burst of
+    N (at least 1). A limit of 0 drops them all.
+    """
+
+    def __init__(self, limits: dict[str, float]):
+        super().__init__()
+        self.limits = limits
+        self._buckets: dict[float, TokenBuckets] = {}
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        limit = _match(self.limits, record.name)
+        if limit is None:
+            return True
+        if limit <= 0:
+            self.dropped += 1
+            return False
+        buckets = self._buckets.get(limit)
+        if buckets is None:
+            buckets = self._buckets.setdefault(limit, TokenBuckets(max(1.0, limit), limit, maxsize=10000))
+        if buckets.acquire(record.name):
+            return True
+        self.dropped += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of raising."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # cheap part only: merge the args and render the traceback, full formatting is
+        # left to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 # Configure logging as early as possible, even before uvicorn imports
@@ -59,77 +180,69 @@ class ColoredFormatter(logging.Formatter):
 _log_format = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
 _date_format = '%Y-%m-%d %H:%M:%S'
 
-# Configure root logger first with colored formatter
-root_logger = logging.getLogger()
-root_logger.handlers = []
-root_handler = logging.StreamHandler(sys.stdout)
-root_handler.setFormatter(ColoredFormatter(_log_format, datefmt=_date_format))
-root_logger.addHandler(root_handler)
-root_logger.setLevel(logging.INFO)
-
-# Configure basic logging with colored formatter
-logging.basicConfig(
-    level=logging.INFO,
-    format=_log_format,
-    datefmt=_date_format,
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ],
-    force=True  # Override any existing configuration
-)
-
-# Replace default formatter with colored formatter for root logger
-for handler in logging.root.handlers:
-    if isinstance(handler, logging.StreamHandler):
-        handler.setFormatter(ColoredFormatter(_log_format, datefmt=_date_format))
-
-
-def setup_logging():
-    """Configure logging with timestamp format and colors for all loggers including uvicorn"""
-    colored_formatter = ColoredFormatter(_log_format, datefmt=_date_format)
-    
-    # Configure uvicorn loggers to use the same format with colors
-    # This must be done early to catch uvicorn startup logs
-    uvicorn_logger = logging.getLogger("uvicorn")
-    uvicorn_logger.handlers = []
-    uvicorn_handler = logging.StreamHandler(sys.stdout)
-    uvicorn_handler.setFormatter(colored_formatter)
-    uvicorn_logger.addHandler(uvicorn_handler)
-    uvicorn_logger.setLevel(logging.INFO)
-    uvicorn_logger.propagate = False
-
-    # Configure uvicorn.access logger (for HTTP requests)
-    uvicorn_access_logger = logging.getLogger("uvicorn.access")
-    uvicorn_access_logger.handlers = []
-    uvicorn_access_handler = logging.StreamHandler(sys.stdout)
-    uvicorn_access_handler.setFormatter(colored_formatter)
-    uvicorn_access_logger.addHandler(uvicorn_access_handler)
-    uvicorn_access_logger.setLevel(logging.INFO)
-    uvicorn_access_logger.propagate = False
-
-    # Configure uvicorn.error logger
-    uvicorn_error_logger = logging.getLogger("uvicorn.error")
-    uvicorn_error_logger.handlers = []
-    uvicorn_error_handler = logging.StreamHandler(sys.stdout)
-    uvicorn_error_handler.setFormatter(colored_formatter)
-    uvicorn_error_logger.addHandler(uvicorn_error_handler)
-    uvicorn_error_logger.setLevel(logging.INFO)
-    uvicorn_error_logger.propagate = False
 
+def _use_colors(stream) -> bool:
+    return "NO_COLOR" not in os.environ and hasattr(stream, "isatty") and stream.isatty()
 
-# Setup logging immediately when this module is imported
-setup_logging()
 
-# Also configure uvicorn loggers immediately (in case they're already created)
-colored_formatter = ColoredFormatter(_log_format, datefmt=_date_format)
-for logger_name in ["uvicorn", "uvicorn.access", "uvicorn.error"]:
-    logger = logging.getLogger(logger_name)
-    if logger.handlers:
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(colored_formatter)
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
-    logger.propagate = False
+def _make_formatter(stream) -> logging.Formatter:
+    if CONFIG.LOG_FORMAT == "json":
+        return JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+    if _use_colors(stream):
+        return ColoredFormatter(_log_format, datefmt=_date_format)
+    return logging.Formatter(_log_format, datefmt=_date_format)
+
+
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(_make_formatter(sys.stdout))
+
+queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=CONFIG.LOG_QUEUE_SIZE))
+sampling_filter = SamplingFilter(CONFIG.LOG_SAMPLING)
+rate_limit_filter = RateLimitFilter(CONFIG.LOG_RATE_LIMITS)
+queue_handler.addFilter(sampling_filter)
+queue_handler.addFilter(rate_limit_filter)
+
+listener = QueueListener(queue_handler.queue, _stream_handler, respect_handler_level=True)
+
+
+def setup_logging(handler: logging.Handler = queue_handler):
+    """Route the root and uvicorn loggers through the queue (or `handler`)."""
+    root_logger = logging.getLogger()
+    root_logger.handlers = [handler]
+    root_logger.setLevel(CONFIG.LOG_LEVEL)
+
+    # uvicorn installs its own stdout handlers; replace them so its logs go through the queue too
+    for logger_name in ["uvicorn", "uvicorn.access", "uvicorn.error"]:
+        logger = logging.getLogger(logger_name)
+        logger.handlers = [handler]
+        logger.setLevel(CONFIG.LOG_LEVEL)
+        logger.propagate = False
 
+
+def shutdown():
+    """
+    Flushes the queue and stops its thread; records logged afterwards are written directly
+    (synchronously) instead of being lost. Safe to call more than once.
+    """
+    if listener._thread is None:
+        return
+    setup_logging(_stream_handler)
+    listener.stop()
+    # added only now: the listener hands it records that already went through the filters
+    for log_filter in queue_handler.filters:
+        _stream_handler.addFilter(log_filter)
+
+
+def stats() -> dict:
+    return {
+        "queued": queue_handler.queue.qsize(),
+        "dropped_queue_full": queue_handler.dropped,
+        "dropped_sampling": sampling_filter.dropped,
+        "dropped_rate_limit": rate_limit_filter.dropped,
+    }
+
+
+# Setup logging immediately when this module is imported
+setup_logging()
+listener.start()
+atexit.register(shutdown)
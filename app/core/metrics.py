@@ -0,0 +1,240 @@
+"""
+In-process metrics, rendered in the Prometheus text format at /metrics.
+
+HTTP latency and status counts come from middlewares.metrics_middleware, query counts and
+durations from SQLAlchemy cursor events, pool checkout waits from db_context's timed pools.
+Per-request numbers (queries, DB time, pool wait) are collected in a context variable and
+sent back in the Server-Timing header. Counters owned by other modules (bcrypt pool,
+caches, login guard, logging queue) are read when /metrics is rendered.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from app.core import db_context
+from app.core import logging_config
+from app.core.db_context import engine
+from app.core.db_context import async_engine
+from app.core.security import jwt
+from app.core.security import login_guard
+from app.core.security.hash_executor import executor as hash_executor
+from app.core.security.user_cache import user_cache
+from app.core.templates import page_cache
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.label_names + ("le",)
+        with self._lock:
+            for labels, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+def _gauge(name: str, help: str, samples: list[tuple[tuple[str, ...], tuple, float]], kind: str = "gauge") -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for names, values, value in samples:
+        lines.append(f"{name}{_labels(names, values)} {value}")
+    return lines
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+http_queries = Histogram(
+    "http_request_db_queries", "SQL statements per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+db_queries = Counter("db_queries_total", "SQL statements executed.", ("engine",))
+db_query_latency = Histogram("db_query_duration_seconds", "SQL statement execution time.", ("engine",))
+db_pool_wait = Histogram("db_pool_checkout_wait_seconds", "Time spent checking out a pooled connection (wait, connect, pre-ping).", ("engine",))
+
+
+# PER REQUEST
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    statements: dict = field(default_factory=dict)  # statement shape -> query_log.StatementStats
+
+
+# Set by the middleware; sync routes run in the threadpool with a copy of the context,
+# which still points at the same RequestStats object.
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+# SQLALCHEMY HOOKS
+# callback(statement, parameters, executemany, seconds) after every statement, see core.query_log
+query_listeners: list[Callable[[str, object, bool, float], None]] = []
+
+
+def _instrument(sync_engine, label: str) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        db_queries.inc(label)
+        db_query_latency.observe(elapsed, label)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+        for listener in query_listeners:
+            listener(statement, parameters, executemany, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        started = exception_context.connection.info.get("metrics_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+
+def _observe_pool_wait(label: str):
+    def observe(seconds: float) -> None:
+        db_pool_wait.observe(seconds, label)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.pool_wait_seconds += seconds
+
+    return observe
+
+
+_instrument(engine, "sync")
+_instrument(async_engine.sync_engine, "async")
+db_context.pool_wait_listeners["sync"] = _observe_pool_wait("sync")
+db_context.pool_wait_listeners["async"] = _observe_pool_wait("async")
+
+
+# RENDERING
+def _pool_samples() -> list[str]:
+    size, checked_out, overflow = [], [], []
+    for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        if isinstance(pool, QueuePool):
+            size.append((("engine",), (label,), pool.size()))
+            checked_out.append((("engine",), (label,), pool.checkedout()))
+            overflow.append((("engine",), (label,), max(0, pool.overflow())))
+    return (
+        _gauge("db_pool_size", "Configured pool size.", size)
+        + _gauge("db_pool_checked_out", "Connections currently checked out.", checked_out)
+        + _gauge("db_pool_overflow", "Connections open beyond the pool size.", overflow)
+    )
+
+
+def _bcrypt_samples() -> list[str]:
+    hashing = hash_executor.metrics()
+    lines = []
+    for key in ("submitted", "rejected", "completed"):
+        lines += _gauge(f"bcrypt_jobs_{key}_total", f"bcrypt jobs {key}.", [((), (), hashing[key])], "counter")
+    lines += _gauge("bcrypt_jobs_in_flight", "bcrypt jobs queued or running.", [((), (), hashing["in_flight"])])
+    lines += _gauge("bcrypt_queue_wait_seconds_total", "Time bcrypt jobs waited for a worker.",
+                    [((), (), hashing["queue_wait_seconds_total"])], "counter")
+    lines += _gauge("bcrypt_hash_seconds_total", "Time spent hashing.", [((), (), hashing["hash_seconds_total"])], "counter")
+    return lines
+
+
+def _cache_samples() -> list[str]:
+    caches = {"user": user_cache.stats(), "jwt": jwt.token_cache.stats(), "page": page_cache.stats()}
+    lines = []
+    for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        suffix = "_total" if kind == "counter" else ""
+        lines += _gauge(
+            f"cache_{key}{suffix}", f"Cache {key}.",
+            [(("cache",), (name,), stats[key]) for name, stats in caches.items()], kind,
+        )
+    return lines
+
+
+def _login_guard_samples() -> list[str]:
+    guard = login_guard.stats()
+    buckets = [("ip", guard["ip_buckets"]), ("email", guard["email_buckets"])]
+    return (
+        _gauge("login_rejected_total", "Login attempts refused before hashing.",
+               [(("reason",), (name,), stats["rejected"]) for name, stats in buckets]
+               + [(("reason",), ("concurrency",), guard["verifications_rejected"])], "counter")
+        + _gauge("login_buckets", "Token buckets held.", [(("key",), (name,), stats["size"]) for name, stats in buckets])
+    )
+
+
+def _logging_samples() -> list[str]:
+    logs = logging_config.stats()
+    return (
+        _gauge("log_queue_size", "Records waiting to be written.", [((), (), logs["queued"])])
+        + _gauge("log_dropped_total", "Log records dropped.", [
+            (("reason",), (reason,), logs[f"dropped_{reason}"]) for reason in ("queue_full", "sampling", "rate_limit")
+        ], "counter")
+    )
+
+
+def render() -> str:
+    lines = []
+    for metric in (http_requests, http_latency, http_queries, db_queries, db_query_latency, db_pool_wait):
+        lines += metric.render()
+    lines += _pool_samples() + _bcrypt_samples() + _cache_samples() + _login_guard_samples() + _logging_samples()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.core import metrics
+from app.core import query_log
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and SQL statements per route template and adds a Server-Timing
+    header. Installed on the root app and on mounted apps: the outermost one measures,
+    inner ones see the request already tracked and pass it through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or metrics.request_stats.get() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = metrics.RequestStats()
+        token = metrics.request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'app;dur={elapsed_ms:.1f}, '
+                    f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f'pool;dur={stats.pool_wait_seconds * 1000:.1f}'
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            # mounts update the same scope, so the innermost matched route is visible here
+            route = scope.get("route")
+            label = f'{scope.get("root_path", "")}{route.path}' if route is not None and hasattr(route, "path") else "<unmatched>"
+            method = scope["method"]
+            metrics.http_requests.inc(method, label, status_code)
+            metrics.http_latency.observe(elapsed, method, label)
+            metrics.http_queries.observe(stats.queries, method, label)
+            query_log.finish(method, label, status_code, stats, elapsed)
+
+
+def add(app: FastAPI):
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,181 @@
+"""
+Slow-query log and per-request N+1 detector.
+
+Listens to every SQL statement through core.metrics (cursor events on both engines):
+- statements slower than SLOW_QUERY_MS are logged with the app code that issued them;
+- during a request, statements are grouped by shape (the SQL with IN-lists and literals
+  folded), and a request that runs one shape more than N_PLUS_ONE_THRESHOLD times is
+  reported when it ends, with the call site of the repeats (typically a lazy load in a loop);
+- every log record emitted during a request carries `request_queries` / `request_query_ms`
+  (visible with LOG_FORMAT=json).
+
+QUERY_LOG_MODE=development also logs a summary of every request, the statements' parameters
+and a longer call stack. Production only logs problems, and logs slow statements by their
+shape: parameters (password hashes, emails, ...) and inline literals stay out of the logs.
+"""
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.core import logging_config
+from app.core import metrics
+from app.core.config import CONFIG
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - only needed for the async engine
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+DEVELOPMENT = CONFIG.QUERY_LOG_MODE == "development"
+PARAMS_MAX_CHARS = 5000
+CALL_SITE_FRAMES = 5 if DEVELOPMENT else 1
+SUMMARY_TOP_SHAPES = 5
+
+_APP_DIR = str(Path(__file__).resolve().parents[1])
+_SKIPPED_FILES = {str(Path(metrics.__file__).resolve()), str(Path(__file__).resolve())}
+_MIDDLEWARES_DIR = str(Path(__file__).resolve().parent / "middlewares")
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+    call_site: str | None = None
+
+
+# STATEMENT SHAPES
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES_LIST = re.compile(r"(\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def shape(statement: str) -> str:
+    """`statement` with literals and placeholder lists folded, so `IN (?, ?)` and `IN (?, ?, ?)` match."""
+    text = _SPACES.sub(" ", statement).strip()
+    text = _LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?...)", text)
+    return _VALUES_LIST.sub(r"\1", text)
+
+
+# CALL SITES
+def _app_frames(frame, limit: int) -> list[str]:
+    sites = []
+    while frame is not None and len(sites) < limit:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename not in _SKIPPED_FILES and not filename.startswith(_MIDDLEWARES_DIR):
+            sites.append(f"{Path(filename).relative_to(Path(_APP_DIR).parent)}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return sites
+
+
+def call_site() -> str:
+    """Innermost app frames that led to the current statement, innermost first."""
+    sites = _app_frames(sys._getframe(1), CALL_SITE_FRAMES)
+    if not sites and greenlet is not None:
+        # async engine: the statement runs in a greenlet spawned by SQLAlchemy,
+        # the awaiting app code is suspended in its parent
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            sites = _app_frames(parent.gr_frame, CALL_SITE_FRAMES)
+    return " <- ".join(sites) or "<unknown>"
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        text = f"{len(parameters)} rows, first: {parameters[0]!r}"
+    else:
+        text = repr(parameters)
+    return text if len(text) <= PARAMS_MAX_CHARS else text[:PARAMS_MAX_CHARS] + "..."
+
+
+def _log_slow(statement: str, parameters, executemany: bool, seconds: float) -> None:
+    if DEVELOPMENT:
+        logger.warning(
+            "Slow query (%.1f ms) at %s: %s | params: %s",
+            seconds * 1000, call_site(), _SPACES.sub(" ", statement).strip(), _format_parameters(parameters, executemany),
+            extra={"query_ms": round(seconds * 1000, 1), "statement": statement},
+        )
+        return
+    key = shape(statement)
+    rows = f" x {len(parameters)} rows" if executemany and isinstance(parameters, (list, tuple)) else ""
+    logger.warning(
+        "Slow query (%.1f ms) at %s: %s%s",
+        seconds * 1000, call_site(), key, rows,
+        extra={"query_ms": round(seconds * 1000, 1), "statement": key},
+    )
+
+
+# HOOKS
+def _on_statement(statement: str, parameters, executemany: bool, seconds: float) -> None:
+    if seconds * 1000 >= CONFIG.SLOW_QUERY_MS:
+        _log_slow(statement, parameters, executemany, seconds)
+
+    stats = metrics.request_stats.get()
+    if stats is None:
+        return
+    key = shape(statement)
+    entry = stats.statements.get(key)
+    if entry is None:
+        entry = stats.statements[key] = StatementStats()
+    entry.count += 1
+    entry.seconds += seconds
+    if entry.count == CONFIG.N_PLUS_ONE_THRESHOLD + 1:
+        # first repeat over the threshold: the loop issuing them is on the stack now
+        entry.call_site = call_site()
+
+
+class RequestSummaryFilter(logging.Filter):
+    """Adds the current request's query count and DB time to every record logged during it."""
+
+    def filter(self, record):
+        stats = metrics.request_stats.get()
+        if stats is not None:
+            record.request_queries = stats.queries
+            record.request_query_ms = round(stats.query_seconds * 1000, 1)
+        return True
+
+
+def finish(method: str, route: str, status_code: int, stats: metrics.RequestStats, seconds: float) -> None:
+    """Called by the metrics middleware when a request ends: reports repeated statement shapes."""
+    if CONFIG.QUERY_LOG_MODE == "off":
+        return
+    repeated = [
+        (key, entry) for key, entry in stats.statements.items() if entry.count > CONFIG.N_PLUS_ONE_THRESHOLD
+    ]
+    summary = {
+        "route": f"{method} {route}",
+        "status": status_code,
+        "duration_ms": round(seconds * 1000, 1),
+        "queries": stats.queries,
+        "query_ms": round(stats.query_seconds * 1000, 1),
+        "pool_wait_ms": round(stats.pool_wait_seconds * 1000, 1),
+        "top_statements": [
+            {"count": entry.count, "ms": round(entry.seconds * 1000, 1), "statement": key}
+            for key, entry in sorted(stats.statements.items(), key=lambda item: -item[1].count)[:SUMMARY_TOP_SHAPES]
+        ],
+    }
+    for key, entry in repeated:
+        logger.warning(
+            "Possible N+1 on %s %s: statement ran %d times (%.1f ms) at %s: %s",
+            method, route, entry.count, entry.seconds * 1000, entry.call_site, key,
+            extra={"query_summary": summary},
+        )
+    if DEVELOPMENT:
+        logger.info(
+            "%s %s -> %d: %d queries, %.1f ms in DB",
+            method, route, status_code, stats.queries, stats.query_seconds * 1000,
+            extra={"query_summary": summary},
+        )
+
+
+if CONFIG.QUERY_LOG_MODE != "off":
+    metrics.query_listeners.append(_on_statement)
+    logging_config.queue_handler.addFilter(RequestSummaryFilter())
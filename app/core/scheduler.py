@@ -0,0 +1,232 @@
+"""
+Background jobs on APScheduler, started and stopped by the lifespan.
+
+Work that is too slow for a request is submitted (services.job.submit) as a row of
+`background_jobs` and answered with 202 + job id. A dispatcher claims queued rows,
+highest priority first, and runs them on bounded thread pools: `default` for short jobs,
+`heavy` for reports and batch runs, so one cannot starve the other.
+
+Recurring jobs (RECURRING) go through the same queue: every job worker has an in-memory
+timer that submits the job as unique (one insert, rejected by a unique index while one is
+queued or running), and the claim makes sure a queued job runs once. APScheduler's own
+job stores can't be shared between processes, so nothing is persisted in them.
+
+Every worker can submit jobs and, unless started with JOBS_WORKER=false, runs them too;
+any number of workers can, claims are atomic. A claimed job is leased to its worker
+(WORKER_ID), which renews the lease while it runs; a RUNNING job whose lease is older than
+JOBS_LEASE_SECONDS lost its worker and is requeued, so a restart of one worker doesn't
+rerun jobs another one is still running.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import datetime
+from datetime import timedelta
+from typing import Callable
+from uuid import uuid4
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+from pydantic_core import to_jsonable_python
+
+from app.core.config import CONFIG
+from app.core.db_context import session_maker
+from app.models.enums import JobStatus
+from app.repository import job as job_repo
+from app.exceptions.scheme import AppException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL = "default"
+HEAVY_POOL = "heavy"
+POOL_SIZES = {DEFAULT_POOL: CONFIG.JOBS_WORKERS, HEAVY_POOL: CONFIG.JOBS_HEAVY_WORKERS}
+
+DISPATCH_JOB_ID = "jobs_dispatch"
+DISPATCH_EXECUTOR = "dispatch"
+HEARTBEAT_JOB_ID = "jobs_heartbeat"
+
+# owner of the jobs this process claims, unique per process start
+WORKER_ID = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid4().hex[:8]}"
+
+# job name -> interval in minutes (0 disables it)
+RECURRING = {"payroll.refresh": CONFIG.PAYROLL_REFRESH_MINUTES}
+
+scheduler = BackgroundScheduler(
+    jobstores={"default": MemoryJobStore()},
+    executors={
+        **{pool: ThreadPoolExecutor(size) for pool, size in POOL_SIZES.items()},
+        # own thread: a full job pool must not delay dispatching
+        DISPATCH_EXECUTOR: ThreadPoolExecutor(1),
+    },
+    job_defaults={"coalesce": True, "max_instances": 1},
+)
+
+# name -> (handler, pool). Handlers take the job's args as keyword arguments and
+# return something JSON-serializable (or None); they open their own sessions.
+_handlers: dict[str, tuple[Callable, str]] = {}
+
+_in_flight = dict.fromkeys(POOL_SIZES, 0)
+_in_flight_lock = threading.Lock()
+
+# a wake-up during a dispatch makes that dispatch go round once more instead of queueing another
+_dispatching = False
+_dispatch_again = False
+
+
+def job(name: str, pool: str = DEFAULT_POOL):
+    """Registers the decorated function as the handler of background job `name`."""
+    if pool not in POOL_SIZES:
+        raise ValueError(f"Unknown job pool '{pool}'")
+
+    def decorator(fn: Callable) -> Callable:
+        _handlers[name] = (fn, pool)
+        return fn
+
+    return decorator
+
+
+def get_pool(name: str) -> str | None:
+    handler = _handlers.get(name)
+    return handler[1] if handler is not None else None
+
+
+def wake() -> None:
+    """Runs the dispatcher now instead of at its next poll."""
+    global _dispatch_again
+    if not scheduler.running:
+        return
+    with _in_flight_lock:
+        if _dispatching:
+            _dispatch_again = True
+            return
+    try:
+        scheduler.modify_job(DISPATCH_JOB_ID, next_run_time=datetime.now(scheduler.timezone))
+    except JobLookupError:
+        pass
+
+
+def _dispatch() -> None:
+    global _dispatching, _dispatch_again
+    with _in_flight_lock:
+        _dispatching = True
+    while True:
+        with _in_flight_lock:
+            _dispatch_again = False
+        try:
+            _claim_queued()
+        except Exception:
+            logger.exception("Job dispatch failed")
+        with _in_flight_lock:
+            if not _dispatch_again:
+                _dispatching = False
+                return
+
+
+def _claim_queued() -> None:
+    with session_maker() as session:
+        for pool, size in POOL_SIZES.items():
+            with _in_flight_lock:
+                free = size - _in_flight[pool]
+            if free <= 0:
+                continue
+
+            for job_id in job_repo.get_queued_ids(session, pool, free):
+                claimed = job_repo.claim(session, job_id, WORKER_ID, datetime.now())
+                session.commit()
+                if not claimed:
+                    continue
+                with _in_flight_lock:
+                    _in_flight[pool] += 1
+                scheduler.add_job(
+                    _run, args=[job_id, pool], id=f"job:{job_id}", executor=pool, misfire_grace_time=None,
+                )
+
+
+def _run(job_id: str, pool: str) -> None:
+    status, result, error = JobStatus.FAILED, None, None
+    try:
+        with session_maker() as session:
+            row = job_repo.get_by_id(session, job_id)
+            name, args = row.name, json.loads(row.args)
+
+        handler = _handlers.get(name)
+        if handler is None:
+            error = f"Unknown job '{name}'"
+        else:
+            result = json.dumps(to_jsonable_python(handler[0](**args)))
+            status = JobStatus.SUCCEEDED
+    except AppException as e:
+        error = e.message
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        error = str(e)
+    finally:
+        try:
+            with session_maker() as session:
+                finished = job_repo.finish(session, job_id, WORKER_ID, status, result, error, datetime.now())
+                session.commit()
+            if not finished:
+                logger.warning("Job %s lost its lease while running, its result was discarded", job_id)
+        finally:
+            with _in_flight_lock:
+                _in_flight[pool] -= 1
+            wake()
+
+
+def _submit_recurring(name: str) -> None:
+    # imported here: services.job imports this module
+    from app.services import job as job_service
+
+    try:
+        with session_maker() as session:
+            job_service.submit(session, name, unique=True)
+    except Exception:
+        logger.exception("Could not submit recurring job %s", name)
+
+
+def _heartbeat() -> None:
+    """Renews the leases of this worker's running jobs and requeues the expired ones of others."""
+    try:
+        now = datetime.now()
+        with session_maker() as session:
+            job_repo.renew_leases(session, WORKER_ID, now)
+            requeued = job_repo.requeue_expired(session, now - timedelta(seconds=CONFIG.JOBS_LEASE_SECONDS))
+            session.commit()
+    except Exception:
+        logger.exception("Job heartbeat failed")
+        return
+    if requeued:
+        logger.warning("Requeued %d background jobs whose worker stopped renewing their lease", requeued)
+        wake()
+
+
+def start() -> None:
+    if not CONFIG.JOBS_WORKER:
+        logger.warning("JOBS_WORKER is off: background jobs submitted here only run on workers that have it on")
+        return
+
+    _heartbeat()
+    scheduler.add_job(
+        _heartbeat, "interval", seconds=CONFIG.JOBS_LEASE_SECONDS / 4, id=HEARTBEAT_JOB_ID,
+        executor=DISPATCH_EXECUTOR,
+    )
+    scheduler.add_job(
+        _dispatch, "interval", seconds=CONFIG.JOBS_POLL_SECONDS, id=DISPATCH_JOB_ID,
+        executor=DISPATCH_EXECUTOR, next_run_time=datetime.now(),
+    )
+    for name, minutes in RECURRING.items():
+        if minutes > 0:
+            scheduler.add_job(
+                _submit_recurring, "interval", args=[name], minutes=minutes, id=f"recurring:{name}",
+                executor=DISPATCH_EXECUTOR, next_run_time=datetime.now(),
+            )
+    scheduler.start()
+
+
+def shutdown() -> None:
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
@@ -2,9 +2,13 @@ from time import time
 from random import randint
 
 import hashlib
+import logging
 import bcrypt
 
 from app.core.config import CONFIG
+from app.core.security.hash_executor import executor
+
+logger = logging.getLogger(__name__)
 
 
 def _prepare_bytes(secret: str) -> bytes:
@@ -27,10 +31,32 @@ def validate(plain_password: str, hashed_password: str) -> bool:
         prepared = _prepare_bytes(plain_password)
         return bcrypt.checkpw(prepared, hashed_password.encode("utf-8"))
     except Exception as exc:
-        print(exc)
+        logger.warning("Password check failed: %s", exc)
         return False
 
 
+def hash_blocking(password: str) -> str:
+    """`hash` on the bcrypt pool, for sync callers."""
+    return executor.run_blocking(hash, password)
+
+
+def validate_blocking(plain_password: str, hashed_password: str) -> bool:
+    """`validate` on the bcrypt pool, for sync callers."""
+    return executor.run_blocking(validate, plain_password, hashed_password)
+
+
+async def hash_async(password: str) -> str:
+    return await executor.run(hash, password)
+
+
+async def hash_many_async(passwords: list[str]) -> list[str]:
+    return await executor.map(hash, [(password,) for password in passwords])
+
+
+async def validate_async(plain_password: str, hashed_password: str) -> bool:
+    return await executor.run(validate, plain_password, hashed_password)
+
+
 def random_hash() -> str:
     timestamp = time()
     random_number = randint(0, 999999)
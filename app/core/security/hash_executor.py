@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from dataclasses import dataclass
+
+from starlette import status
+
+from app.core.config import CONFIG
+from app.exceptions.scheme import AppException
+
+
+def _timed(fn, args: tuple) -> tuple:
+    """
+    Runs inside the worker. Returns (result, wall clock start, hash seconds).
+    Wall clock is used for the start so queue wait can be measured across processes.
+    """
+    started_at = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, started_at, time.perf_counter() - t0
+
+
+@dataclass
+class HashMetrics:
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    queue_wait_seconds_total: float = 0.0
+    queue_wait_seconds_max: float = 0.0
+    hash_seconds_total: float = 0.0
+    hash_seconds_max: float = 0.0
+
+
+class HashExecutor:
+    """
+    Bounded pool that runs bcrypt off the event loop (`run`) or off the calling thread of sync
+    code (`run_blocking`), so every hash shares one limit and one set of metrics.
+    At most `workers + max_queue` jobs are accepted at once, the rest are rejected with 503.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+        self._metrics = HashMetrics()
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._pool
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._metrics.in_flight >= self.workers + self.max_queue:
+                self._metrics.rejected += 1
+                raise AppException(message="Server is busy, please retry", status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+            self._metrics.in_flight += 1
+            self._metrics.submitted += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._metrics.in_flight -= 1
+
+    def _record(self, submitted_at: float, started_at: float, elapsed: float) -> None:
+        waited = max(0.0, started_at - submitted_at)
+        with self._lock:
+            self._metrics.completed += 1
+            self._metrics.queue_wait_seconds_total += waited
+            self._metrics.queue_wait_seconds_max = max(self._metrics.queue_wait_seconds_max, waited)
+            self._metrics.hash_seconds_total += elapsed
+            self._metrics.hash_seconds_max = max(self._metrics.hash_seconds_max, elapsed)
+
+    async def run(self, fn, *args):
+        self._admit()
+        submitted_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, elapsed = await loop.run_in_executor(self._get_pool(), _timed, fn, args)
+        finally:
+            self._release()
+
+        self._record(submitted_at, started_at, elapsed)
+        return result
+
+    def run_blocking(self, fn, *args):
+        """`run` for sync code (threadpool routes, background jobs): waits for the pool's result."""
+        self._admit()
+        submitted_at = time.time()
+        try:
+            result, started_at, elapsed = self._get_pool().submit(_timed, fn, args).result()
+        finally:
+            self._release()
+
+        self._record(submitted_at, started_at, elapsed)
+        return result
+
+    async def map(self, fn, items: list[tuple]) -> list:
+        """
+        Runs fn(*args) for every args tuple, at most `workers` at a time,
+        so bulk jobs keep the pool busy without tripping the queue limit.
+        """
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def _one(args: tuple):
+            async with semaphore:
+                return await self.run(fn, *args)
+
+        return await asyncio.gather(*(_one(args) for args in items))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            snapshot = asdict(self._metrics)
+        snapshot["workers"] = self.workers
+        snapshot["max_queue"] = self.max_queue
+        return snapshot
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = HashExecutor(CONFIG.HASH_EXECUTOR, CONFIG.HASH_WORKERS, CONFIG.HASH_MAX_QUEUE)
@@ -1,27 +1,64 @@
 from datetime import datetime
 from datetime import timezone
+from time import time
+from typing import Any, Callable
+import logging
 import jwt
 
+from app.core.config import CONFIG
+from app.utils.ttl_cache import TTLCache
+
 
 SECRET_KEY = "SomeRandomSalt"
 ALGORITHM = "HS256"
 
+logger = logging.getLogger(__name__)
+
+_INVALID = object()
+
+# (token, parse) -> decoded body (or parse(body)). Valid entries live until the token's `exp`,
+# invalid ones for JWT_NEGATIVE_CACHE_TTL so replayed garbage is rejected without verifying again.
+token_cache = TTLCache(maxsize=CONFIG.JWT_CACHE_SIZE, ttl=CONFIG.JWT_NEGATIVE_CACHE_TTL.total_seconds())
+
 
 def encode(data: dict, exp: datetime) -> str:
     iat = datetime.now(timezone.utc).replace(tzinfo=None)
-            
+
     token_data = {
         "iat": iat,
         "exp": exp,
         "body": data
     }
-    
+
     return jwt.encode(token_data, SECRET_KEY, algorithm=ALGORITHM)
 
-def decode(token: str) -> dict | None:
+def decode(token: str, parse: Callable[[dict], Any] | None = None) -> Any | None:
+    """
+    Verify `token` and return its body, or `parse(body)` when a parser is given.
+    Returns None for invalid/expired tokens or bodies the parser rejects.
+    """
+    key = (token, parse)
+    cached = token_cache.get(key)
+    if cached is _INVALID:
+        return None
+    if cached is not None:
+        return cached
+
     try:
-        data:dict = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return data.get("body")
-    except jwt.PyJWTError as e:
-        print(e)
+        data: dict = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        body = data.get("body")
+        result = parse(body) if parse is not None and body is not None else body
+    except (jwt.PyJWTError, TypeError, ValueError) as e:
+        logger.debug("Rejected token: %s", e)
+        token_cache.set(key, _INVALID)
+        return None
+
+    if result is None:
+        token_cache.set(key, _INVALID)
         return None
+
+    exp = data.get("exp")
+    if exp is not None:
+        token_cache.set(key, result, ttl=exp - time())
+
+    return result
@@ -0,0 +1,68 @@
+"""
+Admission control in front of bcrypt for logins: token buckets per client IP and per
+email, and a cap on concurrent password verifications. Everything is checked before any
+hashing, so rejected attempts cost a dict lookup and a 429.
+"""
+import threading
+from contextlib import contextmanager
+
+from starlette import status
+
+from app.core.config import CONFIG
+from app.exceptions.scheme import AppException
+from app.utils import formatting
+from app.utils.rate_limit import TokenBuckets
+
+
+ip_buckets = TokenBuckets(
+    capacity=CONFIG.LOGIN_IP_BURST,
+    refill_per_second=CONFIG.LOGIN_IP_PER_MINUTE / 60,
+    maxsize=CONFIG.LOGIN_BUCKETS_MAX,
+)
+email_buckets = TokenBuckets(
+    capacity=CONFIG.LOGIN_EMAIL_BURST,
+    refill_per_second=CONFIG.LOGIN_EMAIL_PER_MINUTE / 60,
+    maxsize=CONFIG.LOGIN_BUCKETS_MAX,
+)
+
+
+class ConcurrencyLimit:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """Holds one of `limit` slots, or raises 429 right away when none is free (no waiting)."""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                raise AppException(message="Too many login attempts, please retry later", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+verifications = ConcurrencyLimit(CONFIG.LOGIN_MAX_CONCURRENT_VERIFY)
+
+
+def admit(ip: str | None, email: str) -> None:
+    """Raises 429 when the client IP or the account ran out of login attempts."""
+    if ip is not None and not ip_buckets.acquire(ip):
+        raise AppException(message="Too many login attempts, please retry later", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+    if not email_buckets.acquire(formatting.format_string(email)):
+        raise AppException(message="Too many login attempts, please retry later", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+def stats() -> dict:
+    return {
+        "ip_buckets": ip_buckets.stats(),
+        "email_buckets": email_buckets.stats(),
+        "verifications_in_flight": verifications.in_flight,
+        "verifications_rejected": verifications.rejected,
+    }
@@ -4,14 +4,18 @@ from datetime import timezone
 from fastapi import Request
 from fastapi import Response
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import CONFIG
+from app.core import db_context
 from app.services import user as user_service
 from app.exceptions.scheme import AppException
 from app.models import enums
 from app.models import dto
 from app.core.security import jwt
 from app.core.security import bcrypt_hashing
+from app.core.security import login_guard
+from app.core.security.user_cache import user_cache
 
 
 def get_token(req: Request, res: Response) -> dto.Token:
@@ -19,22 +23,33 @@ def get_token(req: Request, res: Response) -> dto.Token:
     if session_token is None:
         raise AppException(status_code=401, message="Unauthorized")
 
-    token_dict = jwt.decode(session_token)
-    if token_dict is None:
+    token = jwt.decode(session_token, parse=dto.Token.model_validate)
+    if token is None:
         res.delete_cookie(CONFIG.COOKIES_KEY_NAME)
         raise AppException(status_code=401, message="Unauthorized")
 
-    return dto.Token(**token_dict)
+    return token
 
 def get_user(req: Request, res: Response) -> dto.UserDTO:
+    """
+    The token's user, from user_cache when possible. No request-scoped session: on a cache miss
+    the lookup uses its own read session, returned to the pool before the route runs, so a
+    write route never holds two connections.
+    """
     token = get_token(req, res)
 
-    user = user_service.get_by_id(token.user_id)
+    cached = user_cache.get(token.user_id)
+    if cached is not None:
+        return cached
+
+    with db_context.read_session_maker() as db:
+        user = user_service.get_by_id_dto(db, token.user_id)
     if user is None:
         res.delete_cookie(CONFIG.COOKIES_KEY_NAME)
         raise AppException(status_code=401, message="Unauthorized")
 
-    return user.to_dto()
+    user_cache.set(token.user_id, user)
+    return user
 
 def get_admin(user: dto.UserDTO = Depends(get_user)) -> dto.UserDTO:
     if user.role != enums.UserRole.ADMIN:
@@ -42,11 +57,16 @@ def get_admin(user: dto.UserDTO = Depends(get_user)) -> dto.UserDTO:
 
     return user
 
-async def login(obj: dto.UserLoginDTO, res: Response) -> str:
+async def login(db: AsyncSession, obj: dto.UserLoginDTO, res: Response, ip: str | None = None) -> str:
     NOW = datetime.now(timezone.utc)
 
-    user_db = user_service.get_by_email(obj.email)
-    if bcrypt_hashing.validate(obj.password, user_db.password) is False:
+    # 429 before touching the DB or bcrypt
+    login_guard.admit(ip, obj.email)
+
+    user_db = await user_service.get_by_email_async(db, obj.email)
+    with login_guard.verifications.slot():
+        valid = await bcrypt_hashing.validate_async(obj.password, user_db.password)
+    if valid is False:
         raise AppException("Incorrect password", 401)
 
     exp_date = NOW + CONFIG.SESSION_TIME
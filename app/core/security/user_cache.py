@@ -0,0 +1,7 @@
+from app.core.config import CONFIG
+from app.utils.ttl_cache import TTLCache
+
+
+# user_id -> dto.UserDTO for session.get_user.
+# Invalidated by repository.user writes and by services after the commit.
+user_cache = TTLCache(maxsize=CONFIG.USER_CACHE_SIZE, ttl=CONFIG.USER_CACHE_TTL.total_seconds())
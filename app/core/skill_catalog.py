@@ -0,0 +1,56 @@
+import threading
+
+from sqlalchemy.orm import Session
+
+
+class SkillCatalog:
+    """
+    Process-level SkillDb name -> id map. Loaded once with a single SELECT, then kept
+    current by the services that create skills (after their commit). Names are never
+    renamed in place; a skill deleted elsewhere leaves a stale id behind, which makes the
+    insert using it fail on its foreign key: services.skill then clears the catalog and retries.
+    """
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def ensure_loaded(self, session: Session) -> None:
+        if self.loaded:
+            return
+        # imported here: the repository module imports this one
+        from app.repository import skill as skill_repo
+
+        ids = skill_repo.get_all_ids(session)
+        with self._lock:
+            self._ids.update(ids)
+            self.loaded = True
+
+    def lookup(self, names) -> tuple[dict[str, int], list[str]]:
+        """Returns (known name -> id, unknown names)."""
+        found: dict[str, int] = {}
+        missing: list[str] = []
+        with self._lock:
+            for name in names:
+                skill_id = self._ids.get(name)
+                if skill_id is None:
+                    missing.append(name)
+                else:
+                    found[name] = skill_id
+        return found, missing
+
+    def update(self, ids: dict[str, int]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+skill_catalog = SkillCatalog()
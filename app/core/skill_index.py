@@ -0,0 +1,107 @@
+"""
+In-process inverted index skill_id -> Bitmap of employee ids, for ALL / ANY skill matching
+without relational division in SQL. Built at startup (see warmup) and kept up to date by the
+services that change `employee_skills` in this worker. Each worker holds its own copy, so
+changes made elsewhere (other workers, scripts, cascaded deletes, manual edits) are picked up
+by `ensure_fresh`: at most every SKILL_INDEX_CHECK_SECONDS it compares a cheap aggregate of
+the table with the one seen at the last build, and rebuilds when they differ.
+"""
+import threading
+import time
+from functools import reduce
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import CONFIG
+from app.models.db import employee_skill_table
+from app.utils.bitmap import Bitmap
+
+
+def _version(session: Session) -> tuple:
+    """Changes on any insert or delete of a pair: row count, id sums and newest assignment."""
+    table = employee_skill_table.c
+    return tuple(session.execute(
+        select(func.count(), func.sum(table.employee_id), func.sum(table.skill_id), func.max(table.created_at))
+    ).one())
+
+
+class SkillIndex:
+    def __init__(self):
+        self._by_skill: dict[int, Bitmap] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._version: tuple | None = None
+        self._checked_at = 0.0
+        self.built = False
+
+    def build(self, session: Session) -> int:
+        """(Re)load every assignment. Returns the number of pairs indexed."""
+        # read before the rows: a change in between only causes one more rebuild later
+        version = _version(session)
+        ids_by_skill: dict[int, list[int]] = {}
+        count = 0
+        rows = session.execute(
+            select(employee_skill_table.c.skill_id, employee_skill_table.c.employee_id)
+        )
+        for skill_id, employee_id in rows:
+            ids_by_skill.setdefault(skill_id, []).append(employee_id)
+            count += 1
+        by_skill = {skill_id: Bitmap.of(ids) for skill_id, ids in ids_by_skill.items()}
+
+        with self._lock:
+            self._by_skill = by_skill
+            self._version = version
+            self._checked_at = time.monotonic()
+            self.built = True
+        return count
+
+    def ensure_fresh(self, session: Session) -> None:
+        """Builds the index, or rebuilds it if `employee_skills` changed behind this worker's back."""
+        if not self.built:
+            self.build(session)
+            return
+        if time.monotonic() - self._checked_at < CONFIG.SKILL_INDEX_CHECK_SECONDS:
+            return
+        # one check at a time; other requests keep using the current index meanwhile
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if _version(session) != self._version:
+                self.build(session)
+            else:
+                self._checked_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def add(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """Record (employee_id, skill_id) assignments. Call after the commit."""
+        ids_by_skill: dict[int, list[int]] = {}
+        for employee_id, skill_id in pairs:
+            ids_by_skill.setdefault(skill_id, []).append(employee_id)
+        with self._lock:
+            for skill_id, ids in ids_by_skill.items():
+                self._by_skill[skill_id] = self._by_skill.get(skill_id, Bitmap()) | Bitmap.of(ids)
+
+    def remove_employee(self, employee_id: int) -> None:
+        """Drop a deleted employee (assignments go with it by cascade). Call after the commit."""
+        with self._lock:
+            for bitmap in self._by_skill.values():
+                bitmap.discard(employee_id)
+
+    def match(self, skill_ids: list[int], match_all: bool) -> Bitmap:
+        """Employees having all (or any) of `skill_ids`."""
+        with self._lock:
+            bitmaps = [self._by_skill.get(skill_id, Bitmap()) for skill_id in set(skill_ids)]
+            if not bitmaps:
+                return Bitmap()
+            if match_all:
+                # smallest first: the running AND shrinks as early as possible
+                bitmaps.sort(key=len)
+                return reduce(lambda a, b: a & b, bitmaps)
+            return reduce(lambda a, b: a | b, bitmaps)
+
+
+skill_index = SkillIndex()
@@ -1,4 +1,42 @@
+import os
+
+from fastapi.requests import Request
+from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+from app.core.config import CONFIG
+from app.utils.ttl_cache import TTLCache
+
+
+templates = Jinja2Templates(directory="app/templates")
+
+# compiled templates on disk, shared by every worker on the host
+os.makedirs(CONFIG.JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(CONFIG.JINJA_BYTECODE_CACHE_DIR)
+
+# (template, locale, context) -> rendered bytes, for pages that don't depend on the user
+page_cache = TTLCache(maxsize=CONFIG.PAGE_CACHE_SIZE, ttl=CONFIG.PAGE_CACHE_TTL.total_seconds())
+
+
+def _locale(req: Request) -> str:
+    return req.headers.get("accept-language", "").split(",")[0].split(";")[0].strip().lower()
+
 
+def cached_response(req: Request, name: str, context: dict, volatile: tuple[str, ...] = ()) -> HTMLResponse:
+    """
+    Renders a public page through `page_cache`. Keys in `volatile` (e.g. the server time)
+    are left out of the cache key, so they are at most PAGE_CACHE_TTL stale.
+    The template must not use `request` beyond what the locale captures.
+    """
+    key = (
+        name,
+        _locale(req),
+        tuple(sorted((k, v) for k, v in context.items() if k not in volatile)),
+    )
+    body = page_cache.get(key)
+    if body is None:
+        body = templates.get_template(name).render({"request": req, **context}).encode("utf-8")
+        page_cache.set(key, body)
 
-templates = Jinja2Templates(directory="app/templates")
\ No newline at end of file
+    return HTMLResponse(body)
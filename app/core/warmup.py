@@ -0,0 +1,104 @@
+"""
+Startup warm-up: fills the DB pools, compiles the templates, builds the skill index and runs the hot
+serialization / JWT / bcrypt paths once, so the first requests of a new worker
+don't pay for it. `readiness` flips to ready when it is done.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timedelta
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import CONFIG
+from app.core.db_context import engine
+from app.core.db_context import async_engine
+from app.core.db_context import read_session_maker
+from app.core.skill_index import skill_index
+from app.core.templates import templates
+from app.core.security import jwt
+from app.core.security import bcrypt_hashing
+from app.models import dto
+from app.models import enums
+from app.utils.api_response import ApiResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    def __init__(self):
+        self.ready = False
+        self.error: str | None = None
+
+
+readiness = Readiness()
+
+
+def _pool_target(pool) -> int:
+    size = getattr(pool, "size", None)
+    return min(CONFIG.WARMUP_POOL_CONNECTIONS, size()) if callable(size) else CONFIG.WARMUP_POOL_CONNECTIONS
+
+
+def _warm_pool() -> int:
+    # hold all of them at once, otherwise the pool hands back the same connection every time
+    connections = [engine.connect() for _ in range(_pool_target(engine.pool))]
+    for connection in connections:
+        connection.close()
+    return len(connections)
+
+
+async def _warm_async_pool() -> int:
+    connections = await asyncio.gather(
+        *(async_engine.connect().start() for _ in range(_pool_target(async_engine.sync_engine.pool)))
+    )
+    for connection in connections:
+        await connection.close()
+    return len(connections)
+
+
+def _build_skill_index() -> int:
+    with read_session_maker() as session:
+        return skill_index.build(session)
+
+
+def _compile_templates() -> int:
+    names = templates.env.list_templates()
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+
+async def _warm_code_paths() -> None:
+    now = datetime.now().replace(microsecond=0)
+    sample = dto.UserDTO(
+        id=0, name="", surname="", role=enums.UserRole.USER, email="", updated_at=now, created_at=now
+    )
+    ApiResponse.success(data=sample)
+    ApiResponse.success(data=[sample], next_cursor=None)
+    ApiResponse.error()
+
+    token = dto.Token(user_id=0, role=enums.UserRole.USER)
+    jwt.decode(jwt.encode(token.model_dump(), now + timedelta(minutes=1)), parse=dto.Token.model_validate)
+
+    # starts a bcrypt worker and loads the C extension
+    await bcrypt_hashing.hash_async("warmup")
+
+
+async def run() -> None:
+    started = datetime.now()
+    try:
+        connections = await run_in_threadpool(_warm_pool)
+        async_connections = await _warm_async_pool()
+        template_count = await run_in_threadpool(_compile_templates)
+        skill_pairs = await run_in_threadpool(_build_skill_index)
+        await _warm_code_paths()
+    except Exception as e:
+        readiness.error = str(e)
+        logger.exception("Warm-up failed")
+        return
+
+    readiness.ready = True
+    logger.info(
+        "Warm-up done in %.2fs: %d sync + %d async connections, %d templates, %d skill assignments indexed",
+        (datetime.now() - started).total_seconds(), connections, async_connections, template_count, skill_pairs,
+    )
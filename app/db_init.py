@@ -1,6 +1,5 @@
-from app.core.db_context import create_tables
 from app.core.db_context import auto_create_db
 
 
-# create_tables()
+# creates the database if needed, then `alembic upgrade head`
 auto_create_db()
\ No newline at end of file
@@ -6,10 +6,16 @@ from fastapi import FastAPI
 
 from app.core import lifespan
 from app.controllers.pages import page_controller
+from app.controllers import metrics_controller
 from app.controllers.api import auth as auth_controller
 from app.controllers.api import user as user_controller
+from app.controllers.api import employee as employee_controller
+from app.controllers.api import payroll as payroll_controller
+from app.controllers.api import job as job_controller
+from app.controllers.api import health as health_controller
 
 from app.core.middlewares import cors_middleware
+from app.core.middlewares import metrics_middleware
 from app.exceptions import handler
 import logging
 
@@ -18,7 +24,7 @@ logger = logging.getLogger(__name__)
 
 # apps
 app = FastAPI(lifespan=lifespan.lifespan) # jinja2 templates
-api = FastAPI(lifespan=lifespan.lifespan) # api for json
+api = FastAPI() # api for json, mounted: the root app's lifespan covers it
 
 # custom exception handlers
 handler.add_html(app)
@@ -26,14 +32,21 @@ handler.add_json(api)
 
 # add middlewares
 cors_middleware.add(api)
+metrics_middleware.add(api)
+metrics_middleware.add(app)
 
 # include page routers
 app.include_router(page_controller.router)
+app.include_router(metrics_controller.router)
 logger.info("Page routers registered")
 
 # include api routers
 api.include_router(auth_controller.router)
 api.include_router(user_controller.router)
+api.include_router(employee_controller.router)
+api.include_router(payroll_controller.router)
+api.include_router(job_controller.router)
+api.include_router(health_controller.router)
 logger.info("API routers registered")
 
 # mount api app
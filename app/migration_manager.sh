@@ -0,0 +1,25 @@
+#!/usr/bin/env bash
+# Helper for Alembic migrations. Run from anywhere, uses alembic.ini at the repo root.
+#
+#   bash app/migration_manager.sh upgrade            # upgrade to head
+#   bash app/migration_manager.sh downgrade -1
+#   bash app/migration_manager.sh revision "add foo" # autogenerate a new revision
+#   bash app/migration_manager.sh current | history
+#   bash app/migration_manager.sh stamp 0001         # adopt a database created by create_all
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+[ -f .env ] && set -a && . ./.env && set +a
+
+cmd="${1:-upgrade}"
+shift || true
+
+case "$cmd" in
+    upgrade)   alembic upgrade "${1:-head}" ;;
+    downgrade) alembic downgrade "${1:--1}" ;;
+    revision)  alembic revision --autogenerate -m "${1:?message required}" ;;
+    current)   alembic current ;;
+    history)   alembic history ;;
+    stamp)     alembic stamp "${1:?revision required}" ;;
+    *)         echo "unknown command: $cmd" >&2; exit 1 ;;
+esac
@@ -0,0 +1,38 @@
+"""indexes for the hot lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# MySQL/MariaDB compare emails case-insensitively through the column collation,
+# the unique index on users.email already covers them.
+_LOWER_EMAIL_DIALECTS = ("postgresql", "sqlite")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name in _LOWER_EMAIL_DIALECTS:
+        op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True)
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    op.create_index("ix_salaries_user_id_salary_date", "salaries", ["user_id", "salary_date"])
+    op.create_index("ix_employee_skills_skill_id", "employee_skills", ["skill_id"])
+    op.create_index("ix_employees_department", "employees", ["department"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_employees_department", table_name="employees")
+    op.drop_index("ix_employee_skills_skill_id", table_name="employee_skills")
+    op.drop_index("ix_salaries_user_id_salary_date", table_name="salaries")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    if op.get_bind().dialect.name in _LOWER_EMAIL_DIALECTS:
+        op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,47 @@
+"""monthly payroll summary
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_salaries_salary_date", "salaries", ["salary_date"])
+    op.create_table(
+        "payroll_monthly",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("total_hours", sa.Float(), nullable=False),
+        sa.Column("avg_hourly_rate", sa.Float(), nullable=True),
+        sa.Column("salary_count", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "month"),
+    )
+    op.create_index("ix_payroll_monthly_month_department", "payroll_monthly", ["month", "department"])
+    op.create_table(
+        "payroll_refresh_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("last_salary_id", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("payroll_refresh_state")
+    op.drop_index("ix_payroll_monthly_month_department", table_name="payroll_monthly")
+    op.drop_table("payroll_monthly")
+    op.drop_index("ix_salaries_salary_date", table_name="salaries")
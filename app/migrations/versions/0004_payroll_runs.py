@@ -0,0 +1,64 @@
+"""batch payroll runs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payroll_runs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("period_end", sa.Date(), nullable=False),
+        sa.Column("first_user_id", sa.Integer(), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("total_chunks", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Enum("RUNNING", "DONE", "FAILED", name="payrollrunstatus"), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "payroll_run_chunks",
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("payroll_runs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("start_user_id", sa.Integer(), nullable=False),
+        sa.Column("rows", sa.Integer(), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("run_id", "start_user_id"),
+    )
+    op.create_table(
+        "payroll_net_pay",
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("payroll_runs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("salary_id", sa.Integer(), sa.ForeignKey("salaries.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("salary_date", sa.DateTime(), nullable=False),
+        sa.Column("gross", sa.Float(), nullable=False),
+        sa.Column("tax_rate", sa.Float(), nullable=False),
+        sa.Column("tax", sa.Float(), nullable=False),
+        sa.Column("net", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("run_id", "salary_id"),
+    )
+    op.create_index("ix_payroll_net_pay_run_id_user_id", "payroll_net_pay", ["run_id", "user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payroll_net_pay_run_id_user_id", table_name="payroll_net_pay")
+    op.drop_table("payroll_net_pay")
+    op.drop_table("payroll_run_chunks")
+    op.drop_table("payroll_runs")
+    sa.Enum(name="payrollrunstatus").drop(op.get_bind(), checkfirst=True)
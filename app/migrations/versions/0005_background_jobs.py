@@ -0,0 +1,49 @@
+"""background job queue
+
+Jobs are queued and tracked here; APScheduler only keeps in-memory timers
+(see core.scheduler).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.String(32), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("pool", sa.String(20), nullable=False),
+        sa.Column("args", sa.Text(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Enum("QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="jobstatus"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_background_jobs_status_pool_priority",
+        "background_jobs",
+        ["status", "pool", "priority", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_status_pool_priority", table_name="background_jobs")
+    op.drop_table("background_jobs")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
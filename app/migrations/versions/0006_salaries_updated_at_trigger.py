@@ -0,0 +1,74 @@
+"""keep salaries.updated_at current on every UPDATE
+
+The payroll summary refresh finds edited salaries through `updated_at`, which only
+had a server default. The ORM sets it on update (`onupdate`); this trigger covers
+statements issued outside of it. Dialects without a statement here rely on the ORM.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UPGRADE = {
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION salaries_touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER salaries_touch_updated_at BEFORE UPDATE ON salaries
+        FOR EACH ROW EXECUTE FUNCTION salaries_touch_updated_at()
+        """,
+    ],
+    "mysql": [
+        """
+        CREATE TRIGGER salaries_touch_updated_at BEFORE UPDATE ON salaries
+        FOR EACH ROW SET NEW.updated_at = CURRENT_TIMESTAMP
+        """,
+    ],
+    # no BEFORE assignment in SQLite: update the row again unless the statement set updated_at itself
+    "sqlite": [
+        """
+        CREATE TRIGGER salaries_touch_updated_at AFTER UPDATE ON salaries
+        FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE salaries SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        """,
+    ],
+}
+UPGRADE["mariadb"] = UPGRADE["mysql"]
+
+DOWNGRADE = {
+    "postgresql": [
+        "DROP TRIGGER IF EXISTS salaries_touch_updated_at ON salaries",
+        "DROP FUNCTION IF EXISTS salaries_touch_updated_at()",
+    ],
+    "mysql": ["DROP TRIGGER IF EXISTS salaries_touch_updated_at"],
+    "mariadb": ["DROP TRIGGER IF EXISTS salaries_touch_updated_at"],
+    "sqlite": ["DROP TRIGGER IF EXISTS salaries_touch_updated_at"],
+}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
@@ -0,0 +1,31 @@
+"""background job leases
+
+Running jobs record the worker that claimed them and a heartbeat it renews;
+only jobs whose lease expired are requeued.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:06
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("background_jobs") as batch_op:
+        batch_op.add_column(sa.Column("worker", sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("background_jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("worker")
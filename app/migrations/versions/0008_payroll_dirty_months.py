@@ -0,0 +1,107 @@
+"""months of salaries changed since the last payroll summary refresh
+
+Triggers on `salaries` record the month of every inserted, updated (old and new month)
+and deleted row in `payroll_dirty_months`, so the refresh recomputes exactly those
+months without scanning `salaries`; the next refresh after this upgrade is a full one.
+Dialects without a statement here have no triggers: their summary is only kept right
+by a `full` refresh.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:07
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _months(dialect_name: str, *rows: str) -> str:
+    """SELECT of the (non-NULL) months of salary_date in trigger rows NEW / OLD."""
+    month = {
+        "postgresql": "date_trunc('month', {row}.salary_date)::date",
+        "mysql": "DATE_FORMAT({row}.salary_date, '%Y-%m-01')",
+        "sqlite": "strftime('%Y-%m-01', {row}.salary_date)",
+    }[dialect_name]
+    from_dual = " FROM DUAL" if dialect_name == "mysql" else ""
+    return " UNION ".join(
+        f"SELECT {month.format(row=row)}{from_dual} WHERE {row}.salary_date IS NOT NULL" for row in rows
+    )
+
+
+EVENTS = {"insert": ("NEW",), "update": ("OLD", "NEW"), "delete": ("OLD",)}
+
+UPGRADE = {
+    "postgresql": [
+        f"""
+        CREATE OR REPLACE FUNCTION salaries_mark_month() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO payroll_dirty_months (month) {_months("postgresql", "NEW")} ON CONFLICT DO NOTHING;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO payroll_dirty_months (month) {_months("postgresql", "OLD", "NEW")} ON CONFLICT DO NOTHING;
+            ELSE
+                INSERT INTO payroll_dirty_months (month) {_months("postgresql", "OLD")} ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER salaries_mark_month AFTER INSERT OR UPDATE OR DELETE ON salaries
+        FOR EACH ROW EXECUTE FUNCTION salaries_mark_month()
+        """,
+    ],
+    "mysql": [
+        f"""
+        CREATE TRIGGER salaries_mark_month_{event} AFTER {event.upper()} ON salaries
+        FOR EACH ROW INSERT IGNORE INTO payroll_dirty_months (month) {_months("mysql", *rows)}
+        """
+        for event, rows in EVENTS.items()
+    ],
+    "sqlite": [
+        f"""
+        CREATE TRIGGER salaries_mark_month_{event} AFTER {event.upper()} ON salaries
+        FOR EACH ROW
+        BEGIN
+            INSERT OR IGNORE INTO payroll_dirty_months (month) {_months("sqlite", *rows)};
+        END
+        """
+        for event, rows in EVENTS.items()
+    ],
+}
+UPGRADE["mariadb"] = UPGRADE["mysql"]
+
+DOWNGRADE = {
+    "postgresql": [
+        "DROP TRIGGER IF EXISTS salaries_mark_month ON salaries",
+        "DROP FUNCTION IF EXISTS salaries_mark_month()",
+    ],
+    "mysql": [f"DROP TRIGGER IF EXISTS salaries_mark_month_{event}" for event in EVENTS],
+    "sqlite": [f"DROP TRIGGER IF EXISTS salaries_mark_month_{event}" for event in EVENTS],
+}
+DOWNGRADE["mariadb"] = DOWNGRADE["mysql"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payroll_dirty_months",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("month"),
+    )
+    for statement in UPGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+    # changes made before the triggers existed aren't marked: the next refresh rebuilds every month
+    op.execute("UPDATE payroll_refresh_state SET refreshed_at = NULL")
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+    op.drop_table("payroll_dirty_months")
@@ -0,0 +1,31 @@
+"""background job dedupe key
+
+Set while a job submitted as unique is queued or running, cleared when it finishes; the
+unique index makes "submit unless one is active" a single atomic insert.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:08
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("background_jobs") as batch_op:
+        batch_op.add_column(sa.Column("dedupe_key", sa.String(100), nullable=True))
+    op.create_index("ux_background_jobs_dedupe_key", "background_jobs", ["dedupe_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_background_jobs_dedupe_key", table_name="background_jobs")
+    with op.batch_alter_table("background_jobs") as batch_op:
+        batch_op.drop_column("dedupe_key")
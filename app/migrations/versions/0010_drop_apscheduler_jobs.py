@@ -0,0 +1,27 @@
+"""drop apscheduler_jobs
+
+Left by the SQLAlchemy job store APScheduler used before recurring jobs went through
+`background_jobs`; nothing reads it any more.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:09
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS apscheduler_jobs")
+
+
+def downgrade() -> None:
+    # the job store recreated its table on start; there is nothing to restore
+    pass
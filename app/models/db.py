@@ -1,11 +1,15 @@
 from sqlalchemy import Integer
 from sqlalchemy import Float
 from sqlalchemy import String
+from sqlalchemy import Text
 from sqlalchemy import Enum
 from sqlalchemy import DateTime
+from sqlalchemy import Date
 from sqlalchemy import ForeignKey
 from sqlalchemy import Table
 from sqlalchemy import Column
+from sqlalchemy import Index
+from sqlalchemy import text
 from sqlalchemy.sql.functions import current_timestamp
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import mapped_column, relationship
@@ -34,11 +38,19 @@ employee_skill_table = Table(
     Column("level", String, nullable=True),
     Column("created_at",DateTime(),server_default=current_timestamp(),
     ),
+    # PK (employee_id, skill_id) serves employee -> skills, this one skill -> employees
+    Index("ix_employee_skills_skill_id", "skill_id"),
 )
 
 
 class UserDb(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # keyset pagination ordered by created_at (id breaks ties)
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # case-insensitive email lookups; MySQL/MariaDB get this from the column's _ci collation
+        Index("ix_users_email_lower", text("lower(email)"), unique=True).ddl_if(dialect=("postgresql", "sqlite")),
+    )
 
     id = mapped_column("id", Integer, primary_key=True, autoincrement=True)
     name = mapped_column("name", String)
@@ -84,6 +96,9 @@ class EmployeeDb(Base):
     """
 
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_department", "department"),
+    )
 
     id = mapped_column("id", Integer, primary_key=True, autoincrement=True)
     user_id = mapped_column(
@@ -116,6 +131,30 @@ class EmployeeDb(Base):
         secondary=employee_skill_table,
         back_populates="employees",
     )
+    # same rows as `skills`, but with the association's `level`; read-only
+    skill_links = relationship("EmployeeSkillDb", viewonly=True)
+
+    def to_dto(self) -> dto.EmployeeDTO:
+        """Convert this row into a DTO. `user` and `skill_links.skill` must be loaded eagerly."""
+        return dto.EmployeeDTO(
+            id=self.id,
+            code=self.code,
+            position=self.position,
+            department=self.department,
+            user=self.user.to_dto(),
+            skills=[
+                dto.EmployeeSkillDTO(id=link.skill.id, name=link.skill.name, level=link.level)
+                for link in self.skill_links
+            ],
+        )
+
+
+class EmployeeSkillDb(Base):
+    """Association row employee <-> skill, mapped read-only to expose `level`."""
+
+    __table__ = employee_skill_table
+
+    skill = relationship("SkillDb", viewonly=True)
 
 
 
@@ -163,17 +202,140 @@ class TaxAccountDb(Base):
 # one to many relationship
 class SalaryDb(Base):
     __tablename__ = "salaries"
+    __table_args__ = (
+        Index("ix_salaries_user_id_salary_date", "user_id", "salary_date"),
+        # month ranges for the payroll summary refresh
+        Index("ix_salaries_salary_date", "salary_date"),
+    )
     id = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
     user_id = mapped_column("user_id", Integer(), ForeignKey("users.id"))
     amount = mapped_column("amount", Float(precision=2))
     amount_hours = mapped_column("amount_hours", Float(precision=1))
     salary_date = mapped_column("salary_date", DateTime())
+    # also maintained by a trigger (migration 0006) for updates issued outside the ORM;
+    # changed months are recorded in payroll_dirty_months by triggers (migration 0008)
     updated_at = mapped_column(
         "updated_at",
         DateTime(),
         server_default=current_timestamp(),
+        onupdate=current_timestamp(),
         server_onupdate=current_timestamp(),
     )
     created_at = mapped_column(
         "created_at", DateTime(), server_default=current_timestamp()
-    )
\ No newline at end of file
+    )
+
+
+class PayrollMonthlyDb(Base):
+    """
+    Payroll summary per user and month, rebuilt from `salaries` by services.payroll.refresh.
+    `department` is the employee's department at refresh time. Reports read this table only.
+    """
+
+    __tablename__ = "payroll_monthly"
+    __table_args__ = (
+        Index("ix_payroll_monthly_month_department", "month", "department"),
+    )
+    user_id = mapped_column("user_id", Integer(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = mapped_column("month", Date(), primary_key=True)  # first day of the month
+    department = mapped_column("department", String, nullable=True)
+    total_amount = mapped_column("total_amount", Float(), nullable=False)
+    total_hours = mapped_column("total_hours", Float(), nullable=False)
+    avg_hourly_rate = mapped_column("avg_hourly_rate", Float(), nullable=True)  # total_amount / total_hours
+    salary_count = mapped_column("salary_count", Integer(), nullable=False)
+    refreshed_at = mapped_column("refreshed_at", DateTime(), nullable=False)
+
+
+class PayrollDirtyMonthDb(Base):
+    """
+    Months with salaries inserted, updated or deleted since the payroll summary refreshed them.
+    Written by triggers on `salaries` (migration 0008), consumed by services.payroll.refresh.
+    """
+
+    __tablename__ = "payroll_dirty_months"
+    month = mapped_column("month", Date(), primary_key=True)  # first day of the month
+
+
+class PayrollRefreshStateDb(Base):
+    """Watermarks of the last payroll summary refresh (single row, id = 1)."""
+
+    __tablename__ = "payroll_refresh_state"
+    id = mapped_column("id", Integer(), primary_key=True)
+    last_salary_id = mapped_column("last_salary_id", Integer(), nullable=False, default=0)
+    refreshed_at = mapped_column("refreshed_at", DateTime(), nullable=True)
+
+
+class PayrollRunDb(Base):
+    """One net-pay computation over a month of salaries, see services.payroll_run."""
+
+    __tablename__ = "payroll_runs"
+    id = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
+    period_start = mapped_column("period_start", Date(), nullable=False)
+    period_end = mapped_column("period_end", Date(), nullable=False)  # exclusive
+    first_user_id = mapped_column("first_user_id", Integer(), nullable=False)
+    chunk_size = mapped_column("chunk_size", Integer(), nullable=False)
+    total_chunks = mapped_column("total_chunks", Integer(), nullable=False)
+    status = mapped_column("status", Enum(enums.PayrollRunStatus), nullable=False)
+    error = mapped_column("error", String, nullable=True)
+    started_at = mapped_column("started_at", DateTime(), nullable=True)
+    finished_at = mapped_column("finished_at", DateTime(), nullable=True)
+    created_at = mapped_column(
+        "created_at", DateTime(), server_default=current_timestamp()
+    )
+
+
+class PayrollRunChunkDb(Base):
+    """Checkpoint: committed together with the chunk's results, a resumed run skips it."""
+
+    __tablename__ = "payroll_run_chunks"
+    run_id = mapped_column("run_id", Integer(), ForeignKey("payroll_runs.id", ondelete="CASCADE"), primary_key=True)
+    start_user_id = mapped_column("start_user_id", Integer(), primary_key=True)
+    rows = mapped_column("rows", Integer(), nullable=False)
+    seconds = mapped_column("seconds", Float(), nullable=False)
+    finished_at = mapped_column("finished_at", DateTime(), nullable=False)
+
+
+class NetPayDb(Base):
+    """Net pay of one salary row for one payroll run."""
+
+    __tablename__ = "payroll_net_pay"
+    __table_args__ = (
+        Index("ix_payroll_net_pay_run_id_user_id", "run_id", "user_id"),
+    )
+    run_id = mapped_column("run_id", Integer(), ForeignKey("payroll_runs.id", ondelete="CASCADE"), primary_key=True)
+    salary_id = mapped_column("salary_id", Integer(), ForeignKey("salaries.id", ondelete="CASCADE"), primary_key=True)
+    user_id = mapped_column("user_id", Integer(), nullable=False)
+    salary_date = mapped_column("salary_date", DateTime(), nullable=False)
+    gross = mapped_column("gross", Float(), nullable=False)
+    tax_rate = mapped_column("tax_rate", Float(), nullable=False)
+    tax = mapped_column("tax", Float(), nullable=False)
+    net = mapped_column("net", Float(), nullable=False)
+
+
+class BackgroundJobDb(Base):
+    """Queue and status of background jobs, see core.scheduler."""
+
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        # dispatcher: next queued jobs of a pool by priority
+        Index("ix_background_jobs_status_pool_priority", "status", "pool", "priority", "created_at"),
+        # at most one queued or running job per key (NULLs don't collide)
+        Index("ux_background_jobs_dedupe_key", "dedupe_key", unique=True),
+    )
+    id = mapped_column("id", String(32), primary_key=True)
+    name = mapped_column("name", String(100), nullable=False)
+    pool = mapped_column("pool", String(20), nullable=False)
+    args = mapped_column("args", Text(), nullable=False)  # JSON object
+    priority = mapped_column("priority", Integer(), nullable=False, default=0)  # higher runs first
+    status = mapped_column("status", Enum(enums.JobStatus), nullable=False)
+    user_id = mapped_column("user_id", Integer(), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    result = mapped_column("result", Text(), nullable=True)  # JSON
+    error = mapped_column("error", String, nullable=True)
+    created_at = mapped_column("created_at", DateTime(), nullable=False)
+    started_at = mapped_column("started_at", DateTime(), nullable=True)
+    finished_at = mapped_column("finished_at", DateTime(), nullable=True)
+    # lease of a RUNNING job: the worker that claimed it renews heartbeat_at
+    worker = mapped_column("worker", String(64), nullable=True)
+    heartbeat_at = mapped_column("heartbeat_at", DateTime(), nullable=True)
+    # jobs submitted as unique: set while queued or running, cleared when finished
+    dedupe_key = mapped_column("dedupe_key", String(100), nullable=True)
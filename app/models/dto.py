@@ -1,3 +1,4 @@
+from datetime import date
 from datetime import datetime
 from typing import Any
 
@@ -5,6 +6,8 @@ from pydantic import BaseModel
 from pydantic import Field
 
 from app.models.enums import UserRole
+from app.models.enums import PayrollRunStatus
+from app.models.enums import JobStatus
 
 
 class ApiResponse(BaseModel):
@@ -44,3 +47,94 @@ class UserUpdatePassDTO(BaseModel):
 class Token(BaseModel):
     user_id: int
     role: str
+
+# EMPLOYEE
+class EmployeeSkillDTO(BaseModel):
+    id: int
+    name: str
+    level: str | None = None
+
+class EmployeeDTO(BaseModel):
+    id: int
+    code: str | None = None
+    position: str | None = None
+    department: str | None = None
+    user: UserDTO
+    skills: list[EmployeeSkillDTO] = []
+
+class SkillLevelDTO(BaseModel):
+    name: str = Field(..., min_length=1)
+    level: str | None = None
+    description: str | None = None
+
+class SkillAssignDTO(BaseModel):
+    employee_ids: list[int] = Field(..., min_length=1)
+    skills: list[SkillLevelDTO] = Field(..., min_length=1)
+
+# PAYROLL
+class PayrollDepartmentDTO(BaseModel):
+    month: date
+    department: str | None = None
+    total_amount: float
+    total_hours: float
+    avg_hourly_rate: float | None = None
+    employee_count: int
+    salary_count: int
+
+class PayrollMonthDTO(BaseModel):
+    user_id: int
+    month: date
+    department: str | None = None
+    total_amount: float
+    total_hours: float
+    avg_hourly_rate: float | None = None
+    salary_count: int
+
+class HistogramDTO(BaseModel):
+    edges: list[float]
+    counts: list[int]
+
+class PayrollMonthDeltaDTO(BaseModel):
+    month: date
+    total_amount: float
+    delta: float | None = None  # vs the previous month with salaries
+    delta_pct: float | None = None
+
+class PayrollDepartmentStatsDTO(BaseModel):
+    department: str | None = None
+    salary_count: int
+    employee_count: int
+    amount_percentiles: dict[str, float]
+    hourly_rate_percentiles: dict[str, float]
+    hourly_rate_histogram: HistogramDTO | None = None
+    months: list[PayrollMonthDeltaDTO]
+
+class PayrollRunDTO(BaseModel):
+    id: int
+    period_start: date
+    period_end: date
+    status: PayrollRunStatus
+    total_chunks: int
+    chunks_done: int
+    rows: int
+    rows_per_second: float | None = None
+    error: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+# JOBS
+class JobSubmitDTO(BaseModel):
+    name: str
+    args: dict[str, Any] = {}
+    priority: int = Field(0, ge=-10, le=10)  # higher runs first
+
+class JobDTO(BaseModel):
+    id: str
+    name: str
+    status: JobStatus
+    priority: int
+    result: Any | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
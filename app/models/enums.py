@@ -4,4 +4,32 @@ from enum import StrEnum
 class UserRole(StrEnum):
     ADMIN = "admin"
     USER = "user"
-    GUEST = "guest"
\ No newline at end of file
+    GUEST = "guest"
+
+
+class UserOrder(StrEnum):
+    ID = "id"
+    CREATED_AT = "created_at"
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class SkillMatch(StrEnum):
+    ALL = "all"
+    ANY = "any"
+
+
+class PayrollRunStatus(StrEnum):
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
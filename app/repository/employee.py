@@ -0,0 +1,63 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm import selectinload
+
+from app.models.db import EmployeeDb
+from app.models.db import EmployeeSkillDb
+
+
+def _with_relations(query):
+    """
+    user via JOIN, skills (+ level) via one SELECT ... IN per page: 2 queries whatever the page size.
+    Anything else raises instead of lazy loading one row at a time.
+    """
+    return query.options(
+        joinedload(EmployeeDb.user),
+        selectinload(EmployeeDb.skill_links).joinedload(EmployeeSkillDb.skill),
+        raiseload("*"),
+    )
+
+
+def get_after(
+    session: Session,
+    after_id: int | None,
+    limit: int,
+    department: str | None = None,
+    position: str | None = None,
+) -> list[EmployeeDb]:
+    """Keyset page ordered by id, optionally filtered by department / position."""
+    query = select(EmployeeDb)
+    if after_id is not None:
+        query = query.where(EmployeeDb.id > after_id)
+    if department is not None:
+        query = query.where(EmployeeDb.department == department)
+    if position is not None:
+        query = query.where(EmployeeDb.position == position)
+
+    query = _with_relations(query.order_by(EmployeeDb.id).limit(limit))
+    return list(session.scalars(query).unique().all())
+
+
+def get_existing_ids(session: Session, ids: list[int]) -> set[int]:
+    existing: set[int] = set()
+    for start in range(0, len(ids), 1000):
+        existing.update(session.scalars(select(EmployeeDb.id).where(EmployeeDb.id.in_(ids[start:start + 1000]))))
+    return existing
+
+
+def get_by_ids(session: Session, ids: list[int]) -> list[EmployeeDb]:
+    """Employees with the given ids, ordered by id. Missing ids are skipped."""
+    if not ids:
+        return []
+    query = _with_relations(select(EmployeeDb).where(EmployeeDb.id.in_(ids)).order_by(EmployeeDb.id))
+    return list(session.scalars(query).unique().all())
+
+
+def get_id_by_user_id(session: Session, user_id: int) -> int | None:
+    return session.scalar(select(EmployeeDb.id).where(EmployeeDb.user_id == user_id))
+
+
+def get_by_id(session: Session, id: int) -> EmployeeDb | None:
+    return session.scalars(_with_relations(select(EmployeeDb).where(EmployeeDb.id == id))).unique().first()
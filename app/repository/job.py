@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy import or_
+from sqlalchemy import update as sql_update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.db import BackgroundJobDb
+from app.models.enums import JobStatus
+
+# Repositories never commit, see repository.user.
+
+
+def add(session: Session, job: BackgroundJobDb) -> BackgroundJobDb:
+    session.add(job)
+    session.flush()
+    return job
+
+
+def add_unique(session: Session, job: BackgroundJobDb) -> BackgroundJobDb | None:
+    """Adds `job` unless a job with its dedupe_key is queued or running (then returns None)."""
+    try:
+        with session.begin_nested():
+            add(session, job)
+        return job
+    except IntegrityError:
+        return None
+
+
+def get_by_id(session: Session, id: str) -> BackgroundJobDb | None:
+    return session.get(BackgroundJobDb, id)
+
+
+def get_by_dedupe_key(session: Session, dedupe_key: str) -> BackgroundJobDb | None:
+    return session.scalar(select(BackgroundJobDb).where(BackgroundJobDb.dedupe_key == dedupe_key))
+
+
+def get_queued_ids(session: Session, pool: str, limit: int) -> list[str]:
+    """Next queued jobs of `pool`: highest priority first, then oldest."""
+    return list(session.scalars(
+        select(BackgroundJobDb.id)
+        .where(BackgroundJobDb.status == JobStatus.QUEUED, BackgroundJobDb.pool == pool)
+        .order_by(BackgroundJobDb.priority.desc(), BackgroundJobDb.created_at, BackgroundJobDb.id)
+        .limit(limit)
+    ))
+
+
+def has_active(session: Session, name: str, args: str) -> bool:
+    """Whether a job `name` with exactly these (JSON) args is queued or running."""
+    return session.scalar(
+        select(BackgroundJobDb.id)
+        .where(
+            BackgroundJobDb.name == name,
+            BackgroundJobDb.args == args,
+            BackgroundJobDb.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)),
+        )
+        .limit(1)
+    ) is not None
+
+
+def claim(session: Session, id: str, worker: str, started_at: datetime) -> bool:
+    """QUEUED -> RUNNING, leased to `worker`. False when someone else (another worker) claimed it first."""
+    result = session.execute(
+        sql_update(BackgroundJobDb)
+        .where(BackgroundJobDb.id == id, BackgroundJobDb.status == JobStatus.QUEUED)
+        .values(status=JobStatus.RUNNING, started_at=started_at, worker=worker, heartbeat_at=started_at)
+    )
+    return result.rowcount == 1
+
+
+def finish(
+    session: Session, id: str, worker: str, status: JobStatus, result: str | None, error: str | None, finished_at: datetime
+) -> bool:
+    """False when the job is no longer leased to `worker` (its lease expired and it was requeued)."""
+    result = session.execute(
+        sql_update(BackgroundJobDb)
+        .where(BackgroundJobDb.id == id, BackgroundJobDb.status == JobStatus.RUNNING, BackgroundJobDb.worker == worker)
+        .values(
+            status=status, result=result, error=error, finished_at=finished_at,
+            worker=None, heartbeat_at=None, dedupe_key=None,
+        )
+    )
+    return result.rowcount == 1
+
+
+def renew_leases(session: Session, worker: str, now: datetime) -> int:
+    result = session.execute(
+        sql_update(BackgroundJobDb)
+        .where(BackgroundJobDb.status == JobStatus.RUNNING, BackgroundJobDb.worker == worker)
+        .values(heartbeat_at=now)
+    )
+    return result.rowcount
+
+
+def requeue_expired(session: Session, before: datetime) -> int:
+    """RUNNING jobs whose worker stopped renewing the lease go back to the queue. Returns how many."""
+    result = session.execute(
+        sql_update(BackgroundJobDb)
+        .where(
+            BackgroundJobDb.status == JobStatus.RUNNING,
+            or_(BackgroundJobDb.heartbeat_at.is_(None), BackgroundJobDb.heartbeat_at < before),
+        )
+        .values(status=JobStatus.QUEUED, started_at=None, worker=None, heartbeat_at=None)
+    )
+    return result.rowcount
@@ -0,0 +1,188 @@
+from collections.abc import Iterator
+from datetime import date
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy import insert
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import func
+from sqlalchemy import cast
+from sqlalchemy import literal
+from sqlalchemy import Date
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Session
+
+from app.models.db import SalaryDb
+from app.models.db import EmployeeDb
+from app.models.db import PayrollMonthlyDb
+from app.models.db import PayrollDirtyMonthDb
+from app.models.db import PayrollRefreshStateDb
+
+# Repositories never commit, see repository.user.
+
+
+def _month_expr(dialect_name: str):
+    """First day of salary_date's month, or None when the dialect has no expression for it."""
+    if dialect_name == "postgresql":
+        return func.date_trunc("month", SalaryDb.salary_date)
+    if dialect_name == "sqlite":
+        return func.strftime("%Y-%m-01", SalaryDb.salary_date)
+    if dialect_name in ("mysql", "mariadb"):
+        return func.date_format(SalaryDb.salary_date, "%Y-%m-01")
+    return None
+
+
+def _to_month(value) -> date:
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def get_db_now(session: Session) -> datetime:
+    """CURRENT_TIMESTAMP as the salaries.updated_at default stores it (server clock and time zone)."""
+    now = func.current_timestamp()
+    if session.bind.dialect.name == "postgresql":
+        # timestamptz -> timestamp in the session time zone, like the column default
+        now = cast(now, DateTime())
+    return session.scalar(select(now))
+
+
+def get_max_salary_id(session: Session) -> int:
+    return session.scalar(select(func.max(SalaryDb.id))) or 0
+
+
+def iter_salary_columns(session: Session, after_id: int, up_to_id: int, batch_size: int) -> Iterator[list]:
+    """
+    Streams (id, user_id, department, amount, amount_hours, salary_date) of the salaries
+    with after_id < id <= up_to_id, in batches through a server-side cursor.
+    """
+    query = (
+        select(
+            SalaryDb.id,
+            SalaryDb.user_id,
+            EmployeeDb.department,
+            SalaryDb.amount,
+            SalaryDb.amount_hours,
+            SalaryDb.salary_date,
+        )
+        .select_from(SalaryDb)
+        .outerjoin(EmployeeDb, EmployeeDb.user_id == SalaryDb.user_id)
+        .where(
+            SalaryDb.id > after_id,
+            SalaryDb.id <= up_to_id,
+            SalaryDb.user_id.is_not(None),
+            SalaryDb.salary_date.is_not(None),
+        )
+        .order_by(SalaryDb.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in session.execute(query).partitions():
+        yield batch
+
+
+def get_dirty_months(session: Session) -> list[date]:
+    """Months whose salaries changed since they were last refreshed (see PayrollDirtyMonthDb)."""
+    return sorted(_to_month(month) for month in session.scalars(select(PayrollDirtyMonthDb.month)))
+
+
+def get_all_months(session: Session) -> list[date]:
+    """Every month with salaries or summary rows. Scans `salaries`: full refreshes only."""
+    expr = _month_expr(session.bind.dialect.name)
+    column = expr if expr is not None else SalaryDb.salary_date
+    months = {_to_month(value) for value in session.scalars(
+        select(column).distinct().where(SalaryDb.salary_date.is_not(None))
+    )}
+    months.update(_to_month(month) for month in session.scalars(select(PayrollMonthlyDb.month).distinct()))
+    return sorted(months)
+
+
+def refresh_month(session: Session, month: date, next_month: date, refreshed_at: datetime) -> None:
+    """
+    Recomputes the summary rows of one month with a DELETE and one INSERT ... SELECT, and
+    clears its dirty mark first: a change committed meanwhile marks the month again.
+    """
+    session.execute(sql_delete(PayrollDirtyMonthDb).where(PayrollDirtyMonthDb.month == month))
+    session.execute(sql_delete(PayrollMonthlyDb).where(PayrollMonthlyDb.month == month))
+
+    total_amount = func.coalesce(func.sum(SalaryDb.amount), 0.0)
+    total_hours = func.coalesce(func.sum(SalaryDb.amount_hours), 0.0)
+    source = (
+        select(
+            SalaryDb.user_id,
+            literal(month, Date()),
+            EmployeeDb.department,
+            total_amount,
+            total_hours,
+            total_amount / func.nullif(total_hours, 0),
+            func.count(SalaryDb.id),
+            literal(refreshed_at, DateTime()),
+        )
+        .select_from(SalaryDb)
+        .outerjoin(EmployeeDb, EmployeeDb.user_id == SalaryDb.user_id)
+        .where(
+            SalaryDb.user_id.is_not(None),
+            SalaryDb.salary_date >= month,
+            SalaryDb.salary_date < next_month,
+        )
+        .group_by(SalaryDb.user_id, EmployeeDb.department)
+    )
+    session.execute(
+        insert(PayrollMonthlyDb).from_select(
+            [
+                PayrollMonthlyDb.user_id,
+                PayrollMonthlyDb.month,
+                PayrollMonthlyDb.department,
+                PayrollMonthlyDb.total_amount,
+                PayrollMonthlyDb.total_hours,
+                PayrollMonthlyDb.avg_hourly_rate,
+                PayrollMonthlyDb.salary_count,
+                PayrollMonthlyDb.refreshed_at,
+            ],
+            source,
+        )
+    )
+
+
+def get_state(session: Session) -> PayrollRefreshStateDb | None:
+    return session.get(PayrollRefreshStateDb, 1)
+
+
+def save_state(session: Session, last_salary_id: int, refreshed_at: datetime) -> None:
+    session.merge(PayrollRefreshStateDb(id=1, last_salary_id=last_salary_id, refreshed_at=refreshed_at))
+
+
+def _month_range(query, start: date | None, end: date | None):
+    if start is not None:
+        query = query.where(PayrollMonthlyDb.month >= start)
+    if end is not None:
+        query = query.where(PayrollMonthlyDb.month <= end)
+    return query
+
+
+def get_department_report(session: Session, start: date | None, end: date | None, department: str | None = None):
+    """Rows (month, department, total_amount, total_hours, avg_hourly_rate, employee_count, salary_count)."""
+    total_amount = func.sum(PayrollMonthlyDb.total_amount)
+    total_hours = func.sum(PayrollMonthlyDb.total_hours)
+    query = select(
+        PayrollMonthlyDb.month,
+        PayrollMonthlyDb.department,
+        total_amount.label("total_amount"),
+        total_hours.label("total_hours"),
+        (total_amount / func.nullif(total_hours, 0)).label("avg_hourly_rate"),
+        func.count().label("employee_count"),
+        func.sum(PayrollMonthlyDb.salary_count).label("salary_count"),
+    )
+    query = _month_range(query, start, end)
+    if department is not None:
+        query = query.where(PayrollMonthlyDb.department == department)
+    query = query.group_by(PayrollMonthlyDb.month, PayrollMonthlyDb.department).order_by(
+        PayrollMonthlyDb.month, PayrollMonthlyDb.department
+    )
+    return session.execute(query).all()
+
+
+def get_user_months(session: Session, user_id: int, start: date | None, end: date | None) -> list[PayrollMonthlyDb]:
+    query = _month_range(select(PayrollMonthlyDb).where(PayrollMonthlyDb.user_id == user_id), start, end)
+    return list(session.scalars(query.order_by(PayrollMonthlyDb.month)).all())
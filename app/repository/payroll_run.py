@@ -0,0 +1,103 @@
+from datetime import date
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy import insert
+from sqlalchemy import func
+from sqlalchemy import update as sql_update
+from sqlalchemy.orm import Session
+
+from app.models.db import SalaryDb
+from app.models.db import TaxAccountDb
+from app.models.db import PayrollRunDb
+from app.models.db import PayrollRunChunkDb
+from app.models.db import NetPayDb
+from app.models.enums import PayrollRunStatus
+
+# Repositories never commit, see repository.user.
+
+INSERT_BATCH_SIZE = 1000
+
+
+def add(session: Session, run: PayrollRunDb) -> PayrollRunDb:
+    session.add(run)
+    session.flush()
+    return run
+
+
+def get_by_id(session: Session, id: int) -> PayrollRunDb | None:
+    return session.get(PayrollRunDb, id)
+
+
+def mark_resumed(session: Session, run: PayrollRunDb) -> bool:
+    """
+    Back to RUNNING, not started yet, if the run is still as `run` saw it (same status and
+    start time). False when a concurrent resume got there first.
+    """
+    started = PayrollRunDb.started_at.is_(None) if run.started_at is None else PayrollRunDb.started_at == run.started_at
+    result = session.execute(
+        sql_update(PayrollRunDb)
+        .where(PayrollRunDb.id == run.id, PayrollRunDb.status == run.status, started)
+        .values(status=PayrollRunStatus.RUNNING, error=None, started_at=None, finished_at=None)
+    )
+    return result.rowcount == 1
+
+
+def get_user_id_bounds(session: Session, start: date, end: date) -> tuple[int | None, int | None]:
+    """Lowest and highest user_id with salaries in [start, end)."""
+    row = session.execute(
+        select(func.min(SalaryDb.user_id), func.max(SalaryDb.user_id)).where(
+            SalaryDb.salary_date >= start, SalaryDb.salary_date < end
+        )
+    ).one()
+    return row[0], row[1]
+
+
+def get_chunk_salaries(session: Session, start_user_id: int, end_user_id: int, start: date, end: date):
+    """
+    (salary id, user_id, salary_date, amount, tax rate) of users in [start_user_id, end_user_id)
+    for the period, in one query over ix_salaries_user_id_salary_date. Users without a tax account get 0.
+    """
+    return session.execute(
+        select(
+            SalaryDb.id,
+            SalaryDb.user_id,
+            SalaryDb.salary_date,
+            SalaryDb.amount,
+            func.coalesce(TaxAccountDb.rate, 0.0),
+        )
+        .select_from(SalaryDb)
+        .outerjoin(TaxAccountDb, TaxAccountDb.id == SalaryDb.user_id)
+        .where(
+            SalaryDb.user_id >= start_user_id,
+            SalaryDb.user_id < end_user_id,
+            SalaryDb.salary_date >= start,
+            SalaryDb.salary_date < end,
+        )
+    ).all()
+
+
+def insert_net_pay(session: Session, rows: list[dict]) -> None:
+    for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+        session.execute(insert(NetPayDb), rows[offset:offset + INSERT_BATCH_SIZE])
+
+
+def add_chunk(session: Session, run_id: int, start_user_id: int, rows: int, seconds: float) -> None:
+    session.add(PayrollRunChunkDb(
+        run_id=run_id, start_user_id=start_user_id, rows=rows, seconds=seconds, finished_at=datetime.now(),
+    ))
+
+
+def get_done_chunks(session: Session, run_id: int) -> set[int]:
+    return set(session.scalars(select(PayrollRunChunkDb.start_user_id).where(PayrollRunChunkDb.run_id == run_id)))
+
+
+def get_chunk_totals(session: Session, run_id: int, since: datetime | None = None) -> tuple[int, int]:
+    """(chunks, rows) checkpointed for the run, only those finished after `since` when given."""
+    query = select(func.count(), func.coalesce(func.sum(PayrollRunChunkDb.rows), 0)).where(
+        PayrollRunChunkDb.run_id == run_id
+    )
+    if since is not None:
+        query = query.where(PayrollRunChunkDb.finished_at >= since)
+    chunks, rows = session.execute(query).one()
+    return chunks, rows
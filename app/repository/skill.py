@@ -0,0 +1,109 @@
+from sqlalchemy import select
+from sqlalchemy import insert
+from sqlalchemy import update as sql_update
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects import mysql
+
+from app.models.db import SkillDb
+from app.models.db import employee_skill_table
+
+# Repositories never commit, see repository.user.
+
+# Bound parameters per IN (...) list / rows per executemany, well under every driver's limit.
+CHUNK_SIZE = 1000
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def get_all_ids(session: Session) -> dict[str, int]:
+    return dict(session.execute(select(SkillDb.name, SkillDb.id)).tuples().all())
+
+
+def get_ids_by_name(session: Session, names: list[str]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    for chunk in _chunks(names):
+        ids.update(session.execute(select(SkillDb.name, SkillDb.id).where(SkillDb.name.in_(chunk))).tuples().all())
+    return ids
+
+
+def insert_missing(session: Session, rows: list[dict]) -> None:
+    """
+    Inserts skills (`name`, `description` dicts) with one executemany per chunk,
+    skipping names that already exist, e.g. created meanwhile by another worker.
+    """
+    table = SkillDb.__table__
+    dialect_name = session.bind.dialect.name
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(table).on_conflict_do_nothing(index_elements=[table.c.name])
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(table).on_conflict_do_nothing(index_elements=[table.c.name])
+    elif dialect_name in ("mysql", "mariadb"):
+        stmt = insert(table).prefix_with("IGNORE")
+    else:
+        # no portable "ignore duplicates": leave out the names that exist already
+        existing = get_ids_by_name(session, [row["name"] for row in rows])
+        rows = [row for row in rows if row["name"] not in existing]
+        stmt = insert(table)
+
+    for chunk in _chunks(rows):
+        session.execute(stmt, chunk)
+
+
+def upsert_assignments(session: Session, rows: list[dict]) -> None:
+    """
+    INSERT employee_skills rows (`employee_id`, `skill_id`, `level`), overwriting the level
+    of pairs that already exist. `rows` must not repeat a pair.
+    """
+    table = employee_skill_table
+    dialect_name = session.bind.dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.employee_id, table.c.skill_id],
+            set_={"level": stmt.excluded.level},
+        )
+    elif dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(level=stmt.inserted.level)
+    else:
+        for chunk in _chunks(rows):
+            _upsert_assignments_generic(session, chunk)
+        return
+
+    for chunk in _chunks(rows):
+        session.execute(stmt, chunk)
+
+
+def _upsert_assignments_generic(session: Session, rows: list[dict]) -> None:
+    """Fallback without a native upsert: read which pairs exist, then one executemany each for inserts and updates."""
+    table = employee_skill_table
+    existing = set(session.execute(
+        select(table.c.employee_id, table.c.skill_id).where(
+            table.c.employee_id.in_({row["employee_id"] for row in rows}),
+            table.c.skill_id.in_({row["skill_id"] for row in rows}),
+        )
+    ).tuples().all())
+
+    new_rows = [row for row in rows if (row["employee_id"], row["skill_id"]) not in existing]
+    if new_rows:
+        session.execute(insert(table), new_rows)
+
+    updates = [
+        {"b_employee_id": row["employee_id"], "b_skill_id": row["skill_id"], "b_level": row["level"]}
+        for row in rows
+        if (row["employee_id"], row["skill_id"]) in existing
+    ]
+    if updates:
+        session.execute(
+            sql_update(table)
+            .where(table.c.employee_id == bindparam("b_employee_id"), table.c.skill_id == bindparam("b_skill_id"))
+            .values(level=bindparam("b_level")),
+            updates,
+        )
@@ -1,49 +1,256 @@
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import and_
+from sqlalchemy import or_
+from sqlalchemy import literal
+from sqlalchemy import String
+from sqlalchemy import update as sql_update
+from sqlalchemy import delete as sql_delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+from app.models import dto
 from app.models.db import UserDb
-from app.core.db_context import session_maker
+from app.models.enums import UserOrder
+from app.core.db_context import engine
+from app.core.security.user_cache import user_cache
+
+# Repositories never commit: the session (and its transaction) belongs to the
+# request, see db_context.get_db. Services decide when to commit.
+
+# Columns of dto.UserDTO. Read paths that only feed the API select these as Core rows:
+# no password hash, no identity map, no attribute instrumentation per row.
+DTO_COLUMNS = (
+    UserDb.id,
+    UserDb.name,
+    UserDb.surname,
+    UserDb.role,
+    UserDb.email,
+    UserDb.updated_at,
+    UserDb.created_at,
+)
+
+
+# Lookup key matching ix_users_email_lower (see models.db). Emails are already normalized
+# by the services, MySQL/MariaDB compare case-insensitively through the collation.
+EMAIL_KEY = func.lower(UserDb.email) if engine.dialect.name in ("postgresql", "sqlite") else UserDb.email
+
+
+def _to_dto(row) -> dto.UserDTO:
+    # values come typed from the DB, skip re-validation
+    return dto.UserDTO.model_construct(**row._mapping)
+
+
+def add(session: Session, user: UserDb) -> UserDb:
+    session.add(user)
+    session.flush()
+    session.refresh(user)
+    return user
+
+def update(session: Session, user: UserDb) -> None:
+    user_cache.invalidate(user.id)
+    if user in session:
+        # loaded in this unit of work: flush emits only the changed columns
+        session.flush()
+        return
+    session.execute(
+        sql_update(UserDb).where(UserDb.id == user.id).values({
+            UserDb.name: user.name,
+            UserDb.surname: user.surname,
+            UserDb.role: user.role,
+            UserDb.email: user.email,
+            UserDb.password: user.password
+        })
+    )
+
+def delete(session: Session, id: int) -> None:
+    user_cache.invalidate(id)
+    session.execute(sql_delete(UserDb).where(UserDb.id == id))
+
+def get(session: Session, limit: int = 1000, offset: int = 0) -> list[dto.UserDTO]:
+    rows = session.execute(select(*DTO_COLUMNS).limit(limit).offset(offset))
+    return [_to_dto(row) for row in rows]
+
+def _created_at_bound(value: datetime):
+    # SQLite keeps CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text but binds datetimes as
+    # '...:SS.ffffff', which compares greater: bind the cursor value in the stored form there
+    if engine.dialect.name == "sqlite":
+        return literal(value.isoformat(sep=" "), String)
+    return value
+
+def get_after(session: Session, order_by: UserOrder, after: tuple | None, limit: int) -> list[dto.UserDTO]:
+    """
+    Keyset page: rows strictly after `after` = (sort value, id) in (order_by, id) order.
+    Cost does not grow with the page depth, unlike OFFSET.
+    """
+    query = select(*DTO_COLUMNS)
+    if order_by == UserOrder.CREATED_AT:
+        if after is not None:
+            value, last_id = after
+            value = _created_at_bound(value)
+            query = query.where(or_(
+                UserDb.created_at > value,
+                and_(UserDb.created_at == value, UserDb.id > last_id),
+            ))
+        query = query.order_by(UserDb.created_at, UserDb.id)
+    else:
+        if after is not None:
+            query = query.where(UserDb.id > after[1])
+        query = query.order_by(UserDb.id)
+
+    return [_to_dto(row) for row in session.execute(query.limit(limit))]
+
+def iter_all(session: Session, batch_size: int = 1000) -> Iterator[list[dto.UserDTO]]:
+    """
+    Streams the whole table in batches through a server-side cursor (yield_per),
+    so memory stays flat whatever the table size.
+    """
+    result = session.execute(select(*DTO_COLUMNS).order_by(UserDb.id).execution_options(yield_per=batch_size))
+    for batch in result.partitions():
+        yield [_to_dto(row) for row in batch]
 
+def get_by_id(session: Session, id: int) -> UserDb | None:
+    return session.scalar(select(UserDb).where(UserDb.id == id))
+
+def get_by_email(session: Session, email: str) -> UserDb | None:
+    return session.scalar(select(UserDb).where(EMAIL_KEY == email))
+
+def email_exists(session: Session, email: str) -> bool:
+    return session.scalar(select(UserDb.id).where(EMAIL_KEY == email).limit(1)) is not None
+
+def get_by_id_dto(session: Session, id: int) -> dto.UserDTO | None:
+    row = session.execute(select(*DTO_COLUMNS).where(UserDb.id == id)).first()
+    return _to_dto(row) if row is not None else None
+
+def get_by_email_dto(session: Session, email: str) -> dto.UserDTO | None:
+    row = session.execute(select(*DTO_COLUMNS).where(EMAIL_KEY == email)).first()
+    return _to_dto(row) if row is not None else None
+
+
+def add_if_absent(session: Session, user: UserDb) -> UserDb | None:
+    """
+    Inserts `user` unless its email is taken. Returns the stored row, or None on a duplicate.
+    One round trip on dialects with ON CONFLICT ... RETURNING (Postgres, SQLite),
+    elsewhere a plain INSERT inside a SAVEPOINT.
+    """
+    stmt, returning = _insert_ignore_duplicates(session.bind.dialect.name, UserDb)
+    if returning:
+        return session.scalar(stmt.values(_insert_values(user)).returning(UserDb))
 
-def add(user: UserDb)-> UserDb:
-    # with session_maker.begin() as session:
-    #     session.add(user)
-    #     return user
-    session = session_maker()
     try:
-        session.add(user)
-        session.commit()  # tự quyết định khi nào commit
-        session.refresh(user)
+        with session.begin_nested():
+            add(session, user)
         return user
-    except:
-        session.rollback()
-        raise
-    finally:
-        session.close()
-
-def update(user: UserDb) -> None:
-    with session_maker.begin() as session:
-        session.query(UserDb).filter(UserDb.id == user.id).update({
+    except IntegrityError:
+        return None
+
+
+def _insert_values(user: UserDb) -> dict:
+    return {
+        "name": user.name,
+        "surname": user.surname,
+        "role": user.role,
+        "email": user.email,
+        "password": user.password,
+    }
+
+def _insert_ignore_duplicates(dialect_name: str, target=UserDb.__table__):
+    """
+    INSERT into `target` (table or ORM entity) that skips rows whose email already exists
+    instead of failing. Returns (statement, supports RETURNING).
+    """
+    if dialect_name == "postgresql":
+        # no conflict target: covers both the email constraint and ix_users_email_lower
+        return postgresql.insert(target).on_conflict_do_nothing(), True
+    if dialect_name == "sqlite":
+        return sqlite.insert(target).on_conflict_do_nothing(), True
+    if dialect_name in ("mysql", "mariadb"):
+        return insert(target).prefix_with("IGNORE"), False
+    return insert(target), False
+
+
+# ASYNC
+async def add_async(session: AsyncSession, user: UserDb) -> UserDb:
+    session.add(user)
+    await session.flush()
+    await session.refresh(user)
+    return user
+
+async def add_if_absent_async(session: AsyncSession, user: UserDb) -> UserDb | None:
+    stmt, returning = _insert_ignore_duplicates(session.bind.dialect.name, UserDb)
+    if returning:
+        return await session.scalar(stmt.values(_insert_values(user)).returning(UserDb))
+
+    try:
+        async with session.begin_nested():
+            await add_async(session, user)
+        return user
+    except IntegrityError:
+        return None
+
+async def update_async(session: AsyncSession, user: UserDb) -> None:
+    user_cache.invalidate(user.id)
+    if user in session:
+        await session.flush()
+        return
+    await session.execute(
+        sql_update(UserDb).where(UserDb.id == user.id).values({
             UserDb.name: user.name,
             UserDb.surname: user.surname,
             UserDb.role: user.role,
             UserDb.email: user.email,
             UserDb.password: user.password
         })
+    )
+
+async def delete_async(session: AsyncSession, id: int) -> None:
+    user_cache.invalidate(id)
+    await session.execute(sql_delete(UserDb).where(UserDb.id == id))
+
+async def get_async(session: AsyncSession, limit: int = 1000, offset: int = 0) -> list[UserDb]:
+    result = await session.scalars(select(UserDb).limit(limit).offset(offset))
+    return list(result.all())
+
+async def get_by_id_async(session: AsyncSession, id: int) -> UserDb | None:
+    return await session.scalar(select(UserDb).where(UserDb.id == id))
+
+async def get_by_email_async(session: AsyncSession, email: str) -> UserDb | None:
+    return await session.scalar(select(UserDb).where(EMAIL_KEY == email))
+
+async def email_exists_async(session: AsyncSession, email: str) -> bool:
+    return await session.scalar(select(UserDb.id).where(EMAIL_KEY == email).limit(1)) is not None
+
+async def get_existing_emails_async(session: AsyncSession, emails: list[str]) -> set[str]:
+    if not emails:
+        return set()
+    result = await session.scalars(select(UserDb.email).where(EMAIL_KEY.in_(emails)))
+    return set(result.all())
+
+async def insert_many_async(session: AsyncSession, rows: list[dict]) -> set[str]:
+    """
+    Inserts `rows` (column -> value dicts) in one executemany, skipping duplicate emails.
+    Returns the emails actually inserted.
+    """
+    if not rows:
+        return set()
+    table = UserDb.__table__
+    stmt, returning = _insert_ignore_duplicates(session.bind.dialect.name, table)
+    if returning:
+        result = await session.execute(stmt.returning(table.c.email), rows)
+        return set(result.scalars().all())
 
-def delete(id: int) -> None:
-    with session_maker.begin() as session:
-        session.query(UserDb).filter(UserDb.id == id).delete()
-
-def get(limit:int = 1000, offset: int = 0) -> list[UserDb]:
-    with session_maker() as session:
-        return session.query(UserDb).limit(limit).offset(offset).all()
-
-def get_by_id(id: int) -> UserDb | None:
-    with session_maker() as session:
-        return session.query(UserDb).where(
-            UserDb.id == id
-        ).first()
-
-def get_by_email(email: str) -> UserDb | None:
-    with session_maker.begin() as session:
-        return session.query(UserDb).where(
-            UserDb.email == email
-        ).first()
+    # INSERT IGNORE reports nothing per row: ours are the rows holding the (salted, so
+    # unique) password hash we inserted, a skipped duplicate keeps the existing one
+    await session.execute(stmt, rows)
+    hashes = {row["email"]: row["password"] for row in rows}
+    result = await session.execute(
+        select(UserDb.email, UserDb.password).where(UserDb.email.in_(list(hashes)))
+    )
+    return {email for email, password in result if hashes.get(email) == password}
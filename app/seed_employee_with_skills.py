@@ -9,9 +9,10 @@ Run with:
 
 from sqlalchemy import select
 
-from app.core.db_context import session_maker, create_tables
+from app.core.db_context import session_maker, upgrade_db
 from app.core.security import bcrypt_hashing
-from app.models.db import UserDb, EmployeeDb, SkillDb
+from app.models.db import UserDb, EmployeeDb
+from app.services import skill as skill_service
 
 
 def ensure_user(session, email: str) -> UserDb:
@@ -30,19 +31,8 @@ def ensure_user(session, email: str) -> UserDb:
     return user
 
 
-def ensure_skill(session, name: str, description: str = "") -> SkillDb:
-    skill = session.execute(select(SkillDb).where(SkillDb.name == name)).scalar_one_or_none()
-    if skill:
-        return skill
-
-    skill = SkillDb(name=name, description=description)
-    session.add(skill)
-    session.flush()
-    return skill
-
-
 def seed():
-    create_tables()
+    upgrade_db()
 
     with session_maker() as session:
         user = ensure_user(session, "employee@example.com")
@@ -54,19 +44,24 @@ def seed():
             print(f"Employee for {user.email} already exists with code {existing_employee.code}")
             return
 
-        python_skill = ensure_skill(session, "Python Backend", "Kinh nghiệm phát triển API FastAPI")
-        devops_skill = ensure_skill(session, "DevOps", "CI/CD & container orchestration")
-
         employee = EmployeeDb(
             user_id=user.id,
             code="EMP001",
             position="Senior Backend Developer",
             department="Engineering",
         )
-        employee.skills.extend([python_skill, devops_skill])
-
         session.add(employee)
-        session.commit()
+        session.flush()  # populate employee.id
+
+        # creates the missing skills and links them in a few statements, commits
+        skill_service.assign(
+            session,
+            [(employee.id, "Python Backend", None), (employee.id, "DevOps", None)],
+            descriptions={
+                "Python Backend": "Kinh nghiệm phát triển API FastAPI",
+                "DevOps": "CI/CD & container orchestration",
+            },
+        )
         print("Seeded employee EMP001 with skills Python Backend & DevOps.")
 
 
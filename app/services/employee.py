@@ -0,0 +1,74 @@
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.models import dto
+from app.models import enums
+from app.repository import employee as employee_repo
+from app.utils import pagination
+from app.core.skill_index import skill_index
+from app.exceptions.scheme import AppException
+
+
+def get_page(
+    session: Session,
+    cursor: str | None = None,
+    limit: int = 100,
+    department: str | None = None,
+    position: str | None = None,
+) -> tuple[list[dto.EmployeeDTO], str | None]:
+    """Keyset page of employees with their user and skills. Returns (employees, next_cursor)."""
+    limit = pagination.clamp_limit(limit)
+    after_id = pagination.decode_cursor(cursor, "id")[1] if cursor else None
+
+    rows = employee_repo.get_after(session, after_id, limit + 1, department, position)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = pagination.encode_cursor("id", rows[-1].id, rows[-1].id)
+
+    return [employee.to_dto() for employee in rows], next_cursor
+
+
+def match_skills(
+    session: Session,
+    skill_ids: list[int],
+    mode: enums.SkillMatch = enums.SkillMatch.ALL,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[dto.EmployeeDTO], str | None]:
+    """
+    Employees having all / any of `skill_ids`, same keyset paging as get_page.
+    Matching runs on the in-memory skill index, only the page itself is read from the DB.
+    """
+    limit = pagination.clamp_limit(limit)
+    after_id = pagination.decode_cursor(cursor, "id")[1] if cursor else None
+
+    skill_index.ensure_fresh(session)
+    matches = skill_index.match(skill_ids, match_all=mode == enums.SkillMatch.ALL)
+
+    ids: list[int] = []
+    for employee_id in matches.iter_after(after_id):
+        ids.append(employee_id)
+        if len(ids) > limit:
+            break
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+
+    # an employee deleted since the index was built just drops out of the page
+    rows = employee_repo.get_by_ids(session, ids)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = pagination.encode_cursor("id", ids[-1], ids[-1])
+
+    return [employee.to_dto() for employee in rows], next_cursor
+
+
+def get_by_id(session: Session, id: int) -> dto.EmployeeDTO:
+    employee = employee_repo.get_by_id(session, id)
+    if employee is None:
+        raise AppException(message="Employee not found", status_code=status.HTTP_400_BAD_REQUEST)
+
+    return employee.to_dto()
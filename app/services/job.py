@@ -0,0 +1,88 @@
+import json
+from datetime import datetime
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.models import dto
+from app.models import enums
+from app.models.db import BackgroundJobDb
+from app.repository import job as job_repo
+from app.core import scheduler
+from app.exceptions.scheme import AppException
+
+
+def submit(
+    session: Session,
+    name: str,
+    args: dict[str, Any] | None = None,
+    priority: int = 0,
+    user_id: int | None = None,
+    unique: bool = False,
+) -> dto.JobDTO:
+    """
+    Queues background job `name` (see core.scheduler.job). Commits, returns the job to poll.
+    With `unique`, at most one job `name` (whatever its args) is queued or running across all
+    workers: while one is, that job is returned instead of queueing another.
+    """
+    pool = scheduler.get_pool(name)
+    if pool is None:
+        raise AppException(message="Unknown job", status_code=status.HTTP_400_BAD_REQUEST)
+
+    def new_job() -> BackgroundJobDb:
+        return BackgroundJobDb(
+            id=uuid4().hex,
+            name=name,
+            pool=pool,
+            args=json.dumps(args or {}),
+            priority=priority,
+            status=enums.JobStatus.QUEUED,
+            user_id=user_id,
+            created_at=datetime.now(),
+            dedupe_key=name if unique else None,
+        )
+
+    if not unique:
+        job = job_repo.add(session, new_job())
+    else:
+        # the active job may finish between the rejected insert and the lookup: try again then
+        for _ in range(3):
+            job = job_repo.add_unique(session, new_job()) or job_repo.get_by_dedupe_key(session, name)
+            if job is not None:
+                break
+        else:
+            raise AppException(message="Job is busy, try again", status_code=status.HTTP_400_BAD_REQUEST)
+    session.commit()
+
+    scheduler.wake()
+    return _to_dto(job)
+
+
+def is_active(session: Session, name: str, args: dict[str, Any] | None = None) -> bool:
+    """Whether job `name` with the same args is already queued or running (on any worker)."""
+    return job_repo.has_active(session, name, json.dumps(args or {}))
+
+
+def get(session: Session, id: str, user: dto.UserDTO) -> dto.JobDTO:
+    """Status of a job, visible to the user who submitted it and to admins."""
+    job = job_repo.get_by_id(session, id)
+    if job is None or (user.role != enums.UserRole.ADMIN and job.user_id != user.id):
+        raise AppException(message="Job not found", status_code=status.HTTP_400_BAD_REQUEST)
+
+    return _to_dto(job)
+
+
+def _to_dto(job: BackgroundJobDb) -> dto.JobDTO:
+    return dto.JobDTO(
+        id=job.id,
+        name=job.name,
+        status=job.status,
+        priority=job.priority,
+        result=json.loads(job.result) if job.result is not None else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
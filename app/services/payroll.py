@@ -0,0 +1,88 @@
+import logging
+import time
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app.models import dto
+from app.repository import payroll as payroll_repo
+from app.services import job as job_service
+from app.core.db_context import session_maker
+from app.core import scheduler
+
+logger = logging.getLogger(__name__)
+
+REFRESH_JOB = "payroll.refresh"
+
+
+def _month_start(value: date | None) -> date | None:
+    return value.replace(day=1) if value is not None else None
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+
+def refresh(session: Session, full: bool = False) -> dict:
+    """
+    Brings payroll_monthly up to date. Recomputed months are those marked dirty by the triggers
+    on `salaries` (inserted, updated or deleted rows), read from a small table instead of
+    scanning `salaries`. `full` (and the first run) recomputes every month. Each month is
+    replaced with its own DELETE + INSERT and committed, so locks are short and reports never
+    see an empty summary; an interrupted run leaves the remaining months marked.
+    """
+    started = time.perf_counter()
+    now = payroll_repo.get_db_now(session)
+    state = payroll_repo.get_state(session)
+    up_to_id = payroll_repo.get_max_salary_id(session)
+
+    if full or state is None or state.refreshed_at is None:
+        months = sorted(set(payroll_repo.get_all_months(session)) | set(payroll_repo.get_dirty_months(session)))
+    else:
+        months = payroll_repo.get_dirty_months(session)
+
+    for month in months:
+        payroll_repo.refresh_month(session, month, _next_month(month), now)
+        session.commit()
+
+    payroll_repo.save_state(session, up_to_id, now)
+    session.commit()
+
+    return {
+        "months": [month.isoformat() for month in months],
+        "last_salary_id": up_to_id,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def submit_refresh(session: Session, full: bool = False, user_id: int | None = None) -> dto.JobDTO:
+    """
+    Queues a refresh. Refreshes never overlap (two could rebuild the same month at once): while
+    one is queued or running, recurring or not, that job is returned instead, even if its `full`
+    differs.
+    """
+    return job_service.submit(session, REFRESH_JOB, {"full": full}, priority=5, user_id=user_id, unique=True)
+
+
+@scheduler.job(REFRESH_JOB, pool=scheduler.HEAVY_POOL)
+def refresh_job(full: bool = False) -> dict:
+    """Background job, submitted every PAYROLL_REFRESH_MINUTES (see core.scheduler.RECURRING) or on demand."""
+    with session_maker() as session:
+        result = refresh(session, full)
+    if result["months"]:
+        logger.info("Payroll summary refreshed: %d months in %.3fs", len(result["months"]), result["seconds"])
+    return result
+
+
+def get_department_report(
+    session: Session, start: date | None = None, end: date | None = None, department: str | None = None
+) -> list[dto.PayrollDepartmentDTO]:
+    rows = payroll_repo.get_department_report(session, _month_start(start), _month_start(end), department)
+    return [dto.PayrollDepartmentDTO.model_validate(row._mapping) for row in rows]
+
+
+def get_user_months(
+    session: Session, user_id: int, start: date | None = None, end: date | None = None
+) -> list[dto.PayrollMonthDTO]:
+    rows = payroll_repo.get_user_months(session, user_id, _month_start(start), _month_start(end))
+    return [dto.PayrollMonthDTO.model_validate(row, from_attributes=True) for row in rows]
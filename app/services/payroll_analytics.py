@@ -0,0 +1,183 @@
+"""
+Payroll statistics computed with NumPy over an in-memory, column-oriented snapshot
+of `salaries`: percentile bands, hourly-rate distributions and month-over-month deltas
+per department. The snapshot is loaded in chunks, extended in place when new salary rows
+land (id watermark) and reloaded entirely after PAYROLL_SNAPSHOT_TTL or when rows were
+deleted from the end of the table.
+
+Edited salaries and department changes are only picked up by that reload: the statistics
+can lag them by up to PAYROLL_SNAPSHOT_TTL (10 minutes by default), per worker. Inserts
+show up on the next request.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import dto
+from app.repository import payroll as payroll_repo
+from app.core.config import CONFIG
+
+
+LOAD_BATCH_SIZE = 50000
+PERCENTILES = (10, 25, 50, 75, 90)
+NO_DEPARTMENT = ""
+
+
+@dataclass(frozen=True)
+class SalarySnapshot:
+    user_id: np.ndarray  # int64
+    department: np.ndarray  # int32 codes into `departments`
+    amount: np.ndarray  # float64, NaN when missing
+    hours: np.ndarray  # float64, NaN when missing
+    month: np.ndarray  # datetime64[M]
+    departments: tuple[str, ...]
+    last_salary_id: int
+    loaded_at: float
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+
+def _empty_snapshot(loaded_at: float) -> SalarySnapshot:
+    return SalarySnapshot(
+        user_id=np.empty(0, dtype=np.int64),
+        department=np.empty(0, dtype=np.int32),
+        amount=np.empty(0, dtype=np.float64),
+        hours=np.empty(0, dtype=np.float64),
+        month=np.empty(0, dtype="datetime64[M]"),
+        departments=(),
+        last_salary_id=0,
+        loaded_at=loaded_at,
+    )
+
+
+def _load(session: Session, base: SalarySnapshot, up_to_id: int) -> SalarySnapshot:
+    """`base` plus the salaries with base.last_salary_id < id <= up_to_id, chunk by chunk."""
+    codes = {name: code for code, name in enumerate(base.departments)}
+    chunks = {"user_id": [base.user_id], "department": [base.department],
+              "amount": [base.amount], "hours": [base.hours], "month": [base.month]}
+
+    for batch in payroll_repo.iter_salary_columns(session, base.last_salary_id, up_to_id, LOAD_BATCH_SIZE):
+        # only one batch of Python row objects is alive at a time
+        _, user_ids, departments, amounts, hours, dates = zip(*batch)
+        chunks["user_id"].append(np.array(user_ids, dtype=np.int64))
+        chunks["department"].append(np.fromiter(
+            (codes.setdefault(name or NO_DEPARTMENT, len(codes)) for name in departments),
+            dtype=np.int32, count=len(departments),
+        ))
+        chunks["amount"].append(np.array(amounts, dtype=np.float64))
+        chunks["hours"].append(np.array(hours, dtype=np.float64))
+        chunks["month"].append(np.array(dates, dtype="datetime64[M]"))
+
+    return SalarySnapshot(
+        **{name: np.concatenate(parts) for name, parts in chunks.items()},
+        departments=tuple(codes),
+        last_salary_id=up_to_id,
+        loaded_at=base.loaded_at,
+    )
+
+
+class SnapshotCache:
+    def __init__(self):
+        self._snapshot: SalarySnapshot | None = None
+        self._lock = threading.Lock()
+
+    def get(self, session: Session) -> SalarySnapshot:
+        up_to_id = payroll_repo.get_max_salary_id(session)
+        with self._lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is None or now - snapshot.loaded_at > CONFIG.PAYROLL_SNAPSHOT_TTL.total_seconds():
+                snapshot = _load(session, _empty_snapshot(now), up_to_id)
+            elif up_to_id > snapshot.last_salary_id:
+                snapshot = _load(session, snapshot, up_to_id)
+            elif up_to_id < snapshot.last_salary_id:
+                # rows were deleted
+                snapshot = _load(session, _empty_snapshot(now), up_to_id)
+            self._snapshot = snapshot
+            return snapshot
+
+
+snapshot_cache = SnapshotCache()
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    if values.size == 0:
+        return {}
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _department_stats(snapshot: SalarySnapshot, mask: np.ndarray, code: int, bins: int) -> dto.PayrollDepartmentStatsDTO:
+    amount = snapshot.amount[mask]
+    hours = snapshot.hours[mask]
+    month = snapshot.month[mask]
+
+    amount_known = amount[~np.isnan(amount)]
+    with_hours = ~np.isnan(amount) & (hours > 0)
+    rate = amount[with_hours] / hours[with_hours]
+
+    histogram = None
+    if rate.size:
+        counts, edges = np.histogram(rate, bins=bins)
+        histogram = dto.HistogramDTO(edges=edges.tolist(), counts=counts.tolist())
+
+    # totals per month: one bincount over the month offsets
+    months = []
+    if amount_known.size:
+        known_months = month[~np.isnan(amount)]
+        first = known_months.min()
+        offsets = (known_months - first).astype(np.int64)
+        totals = np.bincount(offsets, weights=amount_known)
+        present = np.bincount(offsets) > 0
+        previous = None
+        for offset in np.flatnonzero(present):
+            total = float(totals[offset])
+            delta = None if previous is None else total - previous
+            delta_pct = None if not previous else delta / previous * 100
+            months.append(dto.PayrollMonthDeltaDTO(
+                month=(first + offset).astype(date), total_amount=total, delta=delta, delta_pct=delta_pct,
+            ))
+            previous = total
+
+    name = snapshot.departments[code]
+    return dto.PayrollDepartmentStatsDTO(
+        department=name if name != NO_DEPARTMENT else None,
+        salary_count=int(mask.sum()),
+        employee_count=int(np.unique(snapshot.user_id[mask]).size),
+        amount_percentiles=_percentiles(amount_known),
+        hourly_rate_percentiles=_percentiles(rate),
+        hourly_rate_histogram=histogram,
+        months=months,
+    )
+
+
+def get_department_stats(
+    session: Session,
+    start: date | None = None,
+    end: date | None = None,
+    department: str | None = None,
+    bins: int = 10,
+) -> list[dto.PayrollDepartmentStatsDTO]:
+    """Statistics per department for salaries between the months of `start` and `end` (inclusive)."""
+    snapshot = snapshot_cache.get(session)
+
+    mask = np.ones(len(snapshot), dtype=bool)
+    if start is not None:
+        mask &= snapshot.month >= np.datetime64(start, "M")
+    if end is not None:
+        mask &= snapshot.month <= np.datetime64(end, "M")
+
+    codes = range(len(snapshot.departments))
+    if department is not None:
+        codes = [code for code in codes if snapshot.departments[code] == department]
+
+    stats = []
+    for code in codes:
+        department_mask = mask & (snapshot.department == code)
+        if department_mask.any():
+            stats.append(_department_stats(snapshot, department_mask, code, bins))
+    return stats
@@ -0,0 +1,181 @@
+"""
+Batch net-pay computation: salary x (1 - TaxAccountDb.rate) for every salary of a month.
+
+Users are split into id-range chunks processed on a thread pool. Each chunk reads its
+salaries and tax rates with one query, writes the results with bulk inserts and commits
+them together with its checkpoint row, so a crashed run resumes with the missing chunks only.
+`rate` is a fraction (0.1 = 10%).
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.models import dto
+from app.models import enums
+from app.models.db import PayrollRunDb
+from app.repository import payroll_run as payroll_run_repo
+from app.core.config import CONFIG
+from app.core.db_context import session_maker
+from app.core import scheduler
+from app.services import job as job_service
+from app.exceptions.scheme import AppException
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "payroll.run"
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+
+def start(session: Session, month: date) -> dto.PayrollRunDTO:
+    """Creates a run for the month of `month` and schedules it. Commits."""
+    period_start = month.replace(day=1)
+    period_end = _next_month(period_start)
+    first_user_id, last_user_id = payroll_run_repo.get_user_id_bounds(session, period_start, period_end)
+    if first_user_id is None:
+        raise AppException(message="No salaries in this period", status_code=status.HTTP_400_BAD_REQUEST)
+
+    chunk_size = CONFIG.PAYROLL_RUN_CHUNK_USERS
+    run = payroll_run_repo.add(session, PayrollRunDb(
+        period_start=period_start,
+        period_end=period_end,
+        first_user_id=first_user_id,
+        chunk_size=chunk_size,
+        total_chunks=(last_user_id - first_user_id) // chunk_size + 1,
+        status=enums.PayrollRunStatus.RUNNING,
+    ))
+    session.commit()
+
+    _submit(session, run.id)
+    return _to_dto(session, run)
+
+
+def resume(session: Session, id: int) -> dto.PayrollRunDTO:
+    """
+    Re-schedules a failed or interrupted run; finished chunks are skipped. Commits.
+    Refused while a job for the run is queued or running on any worker, and the status
+    change is conditional, so concurrent resumes can't both schedule it.
+    """
+    run = _get(session, id)
+    if run.status == enums.PayrollRunStatus.DONE:
+        raise AppException(message="Payroll run already finished", status_code=status.HTTP_400_BAD_REQUEST)
+    if job_service.is_active(session, JOB_NAME, {"run_id": run.id}) or not payroll_run_repo.mark_resumed(session, run):
+        session.rollback()
+        raise AppException(message="Payroll run is already in progress", status_code=status.HTTP_400_BAD_REQUEST)
+    session.commit()
+
+    _submit(session, run.id)
+    return _to_dto(session, run)
+
+
+def get(session: Session, id: int) -> dto.PayrollRunDTO:
+    return _to_dto(session, _get(session, id))
+
+
+def _get(session: Session, id: int) -> PayrollRunDb:
+    run = payroll_run_repo.get_by_id(session, id)
+    if run is None:
+        raise AppException(message="Payroll run not found", status_code=status.HTTP_400_BAD_REQUEST)
+    return run
+
+
+def _to_dto(session: Session, run: PayrollRunDb) -> dto.PayrollRunDTO:
+    chunks_done, rows = payroll_run_repo.get_chunk_totals(session, run.id)
+
+    # wall-clock throughput of the current (or last) attempt
+    rows_per_second = None
+    if run.started_at is not None:
+        _, attempt_rows = payroll_run_repo.get_chunk_totals(session, run.id, since=run.started_at)
+        elapsed = ((run.finished_at or datetime.now()) - run.started_at).total_seconds()
+        rows_per_second = round(attempt_rows / elapsed, 1) if elapsed > 0 else None
+
+    return dto.PayrollRunDTO(
+        id=run.id,
+        period_start=run.period_start,
+        period_end=run.period_end,
+        status=run.status,
+        total_chunks=run.total_chunks,
+        chunks_done=chunks_done,
+        rows=rows,
+        rows_per_second=rows_per_second,
+        error=run.error,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+    )
+
+
+def _submit(session: Session, run_id: int) -> None:
+    job_service.submit(session, JOB_NAME, {"run_id": run_id})
+
+
+@scheduler.job(JOB_NAME, pool=scheduler.HEAVY_POOL)
+def execute(run_id: int) -> None:
+    """Processes the run's missing chunks, `PAYROLL_RUN_WORKERS` at a time."""
+    with session_maker() as session:
+        run = _get(session, run_id)
+        done = payroll_run_repo.get_done_chunks(session, run_id)
+        ranges = [
+            (start_user_id, start_user_id + run.chunk_size)
+            for start_user_id in (run.first_user_id + i * run.chunk_size for i in range(run.total_chunks))
+            if start_user_id not in done
+        ]
+        run.started_at = datetime.now()
+        run.finished_at = None
+        session.commit()
+        period = (run.period_start, run.period_end)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=CONFIG.PAYROLL_RUN_WORKERS, thread_name_prefix="payroll") as pool:
+            rows = sum(pool.map(lambda bounds: _process_chunk(run_id, *bounds, *period), ranges))
+    except Exception as e:
+        logger.exception("Payroll run %d failed", run_id)
+        _finish(run_id, enums.PayrollRunStatus.FAILED, str(e))
+        return
+
+    elapsed = time.perf_counter() - started
+    _finish(run_id, enums.PayrollRunStatus.DONE)
+    logger.info(
+        "Payroll run %d done: %d chunks, %d rows in %.2fs (%.0f rows/s)",
+        run_id, len(ranges), rows, elapsed, rows / elapsed if elapsed > 0 else 0,
+    )
+
+
+def _process_chunk(run_id: int, start_user_id: int, end_user_id: int, period_start: date, period_end: date) -> int:
+    started = time.perf_counter()
+    with session_maker() as session:
+        salaries = payroll_run_repo.get_chunk_salaries(session, start_user_id, end_user_id, period_start, period_end)
+        results = []
+        for salary_id, user_id, salary_date, amount, rate in salaries:
+            gross = amount or 0.0
+            tax = round(gross * rate, 2)
+            results.append({
+                "run_id": run_id,
+                "salary_id": salary_id,
+                "user_id": user_id,
+                "salary_date": salary_date,
+                "gross": gross,
+                "tax_rate": rate,
+                "tax": tax,
+                "net": round(gross - tax, 2),
+            })
+        payroll_run_repo.insert_net_pay(session, results)
+        payroll_run_repo.add_chunk(session, run_id, start_user_id, len(results), time.perf_counter() - started)
+        session.commit()
+    return len(results)
+
+
+def _finish(run_id: int, run_status: enums.PayrollRunStatus, error: str | None = None) -> None:
+    with session_maker() as session:
+        run = _get(session, run_id)
+        run.status = run_status
+        run.error = error
+        run.finished_at = datetime.now()
+        session.commit()
@@ -0,0 +1,86 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.models import dto
+from app.repository import skill as skill_repo
+from app.repository import employee as employee_repo
+from app.core.skill_catalog import skill_catalog
+from app.core.skill_index import skill_index
+from app.exceptions.scheme import AppException
+
+
+def assign_many(session: Session, obj: dto.SkillAssignDTO) -> dict:
+    """Gives every skill of `obj.skills` (with its level) to every employee of `obj.employee_ids`."""
+    descriptions = {skill.name.strip(): skill.description for skill in obj.skills}
+    assignments = [
+        (employee_id, skill.name, skill.level)
+        for employee_id in obj.employee_ids
+        for skill in obj.skills
+    ]
+    return assign(session, assignments, descriptions)
+
+
+def assign(
+    session: Session,
+    assignments: list[tuple[int, str, str | None]],
+    descriptions: dict[str, str | None] | None = None,
+) -> dict:
+    """
+    Upserts (employee_id, skill name, level) assignments with a handful of set-based statements:
+    one existence check and executemany for the employees, missing skills and employee_skills,
+    whatever the number of pairs. Unknown skills are created, known pairs get the new level,
+    later duplicates in `assignments` win. Commits. Returns a summary.
+    """
+    descriptions = descriptions or {}
+
+    # last one wins, also keeps a pair from hitting ON CONFLICT twice in one batch
+    levels: dict[tuple[int, str], str | None] = {}
+    for employee_id, name, level in assignments:
+        name = name.strip()
+        if name == "":
+            raise AppException(message="Skill name is not valid", status_code=status.HTTP_400_BAD_REQUEST)
+        levels[(employee_id, name)] = level
+
+    try:
+        return _assign(session, levels, descriptions)
+    except IntegrityError:
+        # a cached id may belong to a skill deleted since (or an employee deleted since the
+        # existence check): reload the catalog and retry once against the current rows
+        session.rollback()
+        skill_catalog.clear()
+        return _assign(session, levels, descriptions)
+
+
+def _assign(session: Session, levels: dict[tuple[int, str], str | None], descriptions: dict[str, str | None]) -> dict:
+    employee_ids = sorted({employee_id for employee_id, _ in levels})
+    existing_employees = employee_repo.get_existing_ids(session, employee_ids)
+    unknown_employees = [employee_id for employee_id in employee_ids if employee_id not in existing_employees]
+
+    names = sorted({name for _, name in levels})
+    skill_catalog.ensure_loaded(session)
+    skill_ids, missing = skill_catalog.lookup(names)
+
+    created: dict[str, int] = {}
+    if missing:
+        skill_repo.insert_missing(session, [{"name": name, "description": descriptions.get(name)} for name in missing])
+        created = skill_repo.get_ids_by_name(session, missing)
+        skill_ids.update(created)
+
+    rows = [
+        {"employee_id": employee_id, "skill_id": skill_ids[name], "level": level}
+        for (employee_id, name), level in levels.items()
+        if employee_id in existing_employees
+    ]
+    skill_repo.upsert_assignments(session, rows)
+    session.commit()
+
+    # only now: a rolled back transaction must not leave ids behind in the process caches
+    skill_catalog.update(created)
+    skill_index.add((row["employee_id"], row["skill_id"]) for row in rows)
+
+    return {
+        "assigned": len(rows),
+        "skills_created": len(created),
+        "unknown_employees": unknown_employees,
+    }
@@ -1,86 +1,338 @@
+import csv
+import io
+from collections.abc import Iterator
+from itertools import islice
 from random import randint
+from typing import BinaryIO
 
+from pydantic import ValidationError
 from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import db
 from app.models import dto
 from app.models import enums
 from app.repository import user as user_repo
+from app.repository import employee as employee_repo
+from app.core.db_context import session_maker
+from app.core.db_context import read_session_maker
+from app.core import scheduler
+from app.core.skill_index import skill_index
 
 from app.core.security import bcrypt_hashing
+from app.core.security.user_cache import user_cache
 from app.utils import formatting
+from app.utils import pagination
 from app.exceptions.scheme import AppException
 
 MIN_PASS = 100000
 MAX_PASS = 999999
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = list(dto.UserDTO.model_fields)
+IMPORT_BATCH_SIZE = 500
+IMPORT_COLUMNS = ("name", "surname", "email", "password")
+
+
+def get_all(session: Session, limit: int = 1000, offset: int = 0) -> list[dto.UserDTO]:
+    limit = pagination.clamp_limit(limit)
+    return user_repo.get(session, limit, offset)
+
+
+def get_page(
+    session: Session,
+    cursor: str | None = None,
+    order_by: enums.UserOrder | None = None,
+    limit: int = 1000,
+) -> tuple[list[dto.UserDTO], str | None]:
+    """
+    Keyset page of users. Returns (users, next_cursor); next_cursor is None on the last page.
+    Without `order_by` the ordering comes from the cursor (id for the first page).
+    """
+    limit = pagination.clamp_limit(limit)
+    if order_by is None:
+        order_by = pagination.cursor_order_by(cursor, enums.UserOrder) if cursor else enums.UserOrder.ID
+    after = pagination.decode_cursor(cursor, order_by) if cursor else None
+
+    # one extra row tells whether another page exists
+    rows = user_repo.get_after(session, order_by, after, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = pagination.encode_cursor(order_by, getattr(last, order_by), last.id)
+
+    return rows, next_cursor
+
+
+def get_by_id(session: Session, id: int) -> db.UserDb:
+    user = user_repo.get_by_id(session, id)
+    if user is None:
+        raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
 
-
-def get_all(limit: int = 1000, offset: int = 0) -> list[dto.UserDTO]:
-    return [user.to_dto() for user in user_repo.get(limit, offset)]
+    return user
 
 
-def get_by_id(id: int) -> db.UserDb:
-    user = user_repo.get_by_id(id)
+def get_by_id_dto(session: Session, id: int) -> dto.UserDTO:
+    user = user_repo.get_by_id_dto(session, id)
     if user is None:
         raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
 
     return user
 
 
-def get_by_id_dto(id: int) -> dto.UserDTO:
-    user = get_by_id(id)
-    return user.to_dto()
+def get_by_email(session: Session, email: str) -> db.UserDb:
+    email_form = formatting.format_string(email)
+    user = user_repo.get_by_email(session, email_form)
+    if user is None:
+        raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
+
+    return user
 
 
-def get_by_email(email: str) -> db.UserDb:
+def get_by_email_dto(session: Session, email: str) -> dto.UserDTO:
     email_form = formatting.format_string(email)
-    user = user_repo.get_by_email(email_form)
+    user = user_repo.get_by_email_dto(session, email_form)
     if user is None:
         raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
 
     return user
 
 
-def get_by_email_dto(email: str) -> dto.UserDTO:
-    user = get_by_email(email)
+def create_user(session: Session, obj: dto.UserCreateDTO) -> dto.UserDTO:
+    user = _create(session, obj, enums.UserRole.USER)
     return user.to_dto()
 
 
-def create_user(obj: dto.UserCreateDTO) -> dto.UserDTO:
-    user = _create(obj, enums.UserRole.USER)
+def create_admin(session: Session, obj: dto.UserCreateDTO) -> dto.UserDTO:
+    user = _create(session, obj, enums.UserRole.ADMIN)
     return user.to_dto()
 
 
-def create_admin(obj: dto.UserCreateDTO) -> dto.UserDTO:
-    user = _create(obj, enums.UserRole.ADMIN)
+def export(fmt: enums.ExportFormat) -> Iterator[str]:
+    """
+    Yields the users table as NDJSON lines or CSV, one chunk per DB batch.
+    Owns its session: the stream outlives the request-scoped one.
+    """
+    with read_session_maker() as session:
+        if fmt == enums.ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            for batch in user_repo.iter_all(session, EXPORT_BATCH_SIZE):
+                for user in batch:
+                    writer.writerow([getattr(user, column) for column in EXPORT_COLUMNS])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+            return
+
+        for batch in user_repo.iter_all(session, EXPORT_BATCH_SIZE):
+            yield "".join(user.model_dump_json() + "\n" for user in batch)
+
+
+async def get_by_id_async(session: AsyncSession, id: int) -> db.UserDb:
+    user = await user_repo.get_by_id_async(session, id)
+    if user is None:
+        raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
+
+    return user
+
+
+async def get_by_email_async(session: AsyncSession, email: str) -> db.UserDb:
+    email_form = formatting.format_string(email)
+    user = await user_repo.get_by_email_async(session, email_form)
+    if user is None:
+        raise AppException(message="User not found", status_code=status.HTTP_400_BAD_REQUEST)
+
+    return user
+
+
+async def create_user_async(session: AsyncSession, obj: dto.UserCreateDTO) -> dto.UserDTO:
+    user = await _create_async(session, obj, enums.UserRole.USER)
     return user.to_dto()
 
 
-def update_name(user: db.UserDb, obj: dto.UserUpdateNameDTO) -> None:
+async def create_admin_async(session: AsyncSession, obj: dto.UserCreateDTO) -> dto.UserDTO:
+    user = await _create_async(session, obj, enums.UserRole.ADMIN)
+    return user.to_dto()
+
+
+async def import_csv_async(session: AsyncSession, file: BinaryIO) -> dict:
+    """
+    Bulk-creates users from a CSV (columns: name,surname,email,password), batch by batch:
+    validate, dedupe against the file and the DB with one query, hash on the bcrypt pool,
+    then insert with one executemany and commit. Returns a per-row error report
+    (`row` is the 1-based data row, header excluded).
+
+    Batches are committed as they go, so if the bcrypt pool refuses work (503) the import
+    stops there and the partial report is returned: the rows of that batch are reported as
+    failed, the rest of the file is counted in `skipped` and `aborted` holds the reason.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+        missing = [column for column in IMPORT_COLUMNS if column not in (fieldnames or [])]
+        if missing:
+            raise AppException(message=f"Missing CSV columns: {', '.join(missing)}", status_code=status.HTTP_400_BAD_REQUEST)
+
+        report = {"total": 0, "created": 0, "failed": 0, "skipped": 0, "aborted": None, "errors": []}
+        seen_emails: set[str] = set()
+        while True:
+            rows = await run_in_threadpool(list, islice(reader, IMPORT_BATCH_SIZE))
+            if not rows:
+                break
+            first_row = report["total"] + 1
+            report["total"] += len(rows)
+            if report["aborted"] is not None:
+                report["skipped"] += len(rows)
+                continue
+            await _import_batch(session, enumerate(rows, start=first_row), seen_emails, report)
+
+        report["errors"].sort(key=lambda error: error["row"])
+        report["failed"] = len(report["errors"])
+        return report
+    finally:
+        text.detach()
+
+
+async def _import_batch(session: AsyncSession, rows, seen_emails: set[str], report: dict) -> None:
+    errors = report["errors"]
+    candidates: list[tuple[int, db.UserDb, str]] = []
+    for row_no, row in rows:
+        try:
+            obj = dto.UserCreateDTO(**{column: row.get(column) or "" for column in IMPORT_COLUMNS})
+            user = _prepare_create(obj, enums.UserRole.USER)
+        except ValidationError as e:
+            first = e.errors()[0]
+            errors.append({"row": row_no, "email": row.get("email"), "error": f"{first['loc'][0]}: {first['msg']}"})
+            continue
+        except AppException as e:
+            errors.append({"row": row_no, "email": row.get("email"), "error": e.message})
+            continue
+
+        if user.email in seen_emails:
+            errors.append({"row": row_no, "email": user.email, "error": "Duplicate email in file"})
+            continue
+        seen_emails.add(user.email)
+        candidates.append((row_no, user, obj.password))
+
+    existing = await user_repo.get_existing_emails_async(session, [user.email for _, user, _ in candidates])
+    new_users = []
+    for row_no, user, password in candidates:
+        if user.email in existing:
+            errors.append({"row": row_no, "email": user.email, "error": "Email already exists"})
+        else:
+            new_users.append((row_no, user, password))
+
+    try:
+        hashes = await bcrypt_hashing.hash_many_async([password for _, _, password in new_users])
+    except AppException as e:
+        # earlier batches are committed already: report this one as failed and stop
+        report["aborted"] = e.message
+        errors.extend({"row": row_no, "email": user.email, "error": e.message} for row_no, user, _ in new_users)
+        return
+    values = [
+        {"name": user.name, "surname": user.surname, "role": user.role, "email": user.email, "password": password_hash}
+        for (_, user, _), password_hash in zip(new_users, hashes)
+    ]
+    inserted = await user_repo.insert_many_async(session, values)
+    await session.commit()
+
+    report["created"] += len(inserted)
+    for row_no, user, _ in new_users:
+        if user.email not in inserted:
+            # created by someone else between the dedupe query and the insert
+            errors.append({"row": row_no, "email": user.email, "error": "Email already exists"})
+
+
+def update_name(session: Session, user: db.UserDb, obj: dto.UserUpdateNameDTO) -> None:
     user.name = formatting.format_string(obj.name)
     user.surname = formatting.format_string(obj.surname)
-    user_repo.update(user)
+    user_repo.update(session, user)
+    session.commit()
+    # drop again after commit: a concurrent get_user may have cached the old row meanwhile
+    user_cache.invalidate(user.id)
 
 
-def update_password(user: dto.UserDTO, obj: dto.UserUpdatePassDTO) -> None:
-    user_db = get_by_id(user.id)
-    if bcrypt_hashing.validate(obj.old_password, user_db.password) is False:
+def update_password(session: Session, user: dto.UserDTO, obj: dto.UserUpdatePassDTO) -> None:
+    user_db = get_by_id(session, user.id)
+    if bcrypt_hashing.validate_blocking(obj.old_password, user_db.password) is False:
         raise AppException(message="Incorrect password", status_code=status.HTTP_400_BAD_REQUEST)
 
-    _update_password(user_db, obj.new_password)
+    _update_password(session, user_db, obj.new_password)
+    session.commit()
+    # drop again after commit: a concurrent get_user may have cached the old row meanwhile
+    user_cache.invalidate(user.id)
 
 
-def reset_password(email: str) -> None:
-    user = get_by_email(email)
-    new_pass = _reset_password(user)
+def reset_password(session: Session, email: str) -> None:
+    user = get_by_email(session, email)
+    new_pass = _reset_password(session, user)
+    session.commit()
+    user_cache.invalidate(user.id)
     print(f"New password for {user.email} is '{new_pass}'")
 
 
-def delete(id: int) -> None:
-    user_repo.delete(id)
+@scheduler.job("user.reset_password")
+def reset_password_job(email: str) -> None:
+    """Background version of reset_password, see controllers.api.auth."""
+    with session_maker() as session:
+        reset_password(session, email)
+
+
+def delete(session: Session, id: int) -> None:
+    # the employee row and its skills go with the user (ON DELETE CASCADE)
+    employee_id = employee_repo.get_id_by_user_id(session, id)
+    user_repo.delete(session, id)
+    session.commit()
+    # same for a deleted user, who would otherwise stay authenticated until the entry expires
+    user_cache.invalidate(id)
+    if employee_id is not None:
+        skill_index.remove_employee(employee_id)
+
 
+def _create(session: Session, obj: dto.UserCreateDTO, role: enums.UserRole) -> db.UserDb:
+    user_to_db = _prepare_create(obj, role)
+    # cheap lookup first so duplicate signups don't cost a bcrypt hash each
+    if user_repo.email_exists(session, user_to_db.email):
+        raise AppException(message="Email already exists", status_code=status.HTTP_400_BAD_REQUEST)
+    user_to_db.password = bcrypt_hashing.hash_blocking(obj.password)
+
+    # the insert still guards against a concurrent signup with the same email
+    user = user_repo.add_if_absent(session, user_to_db)
+    if user is None:
+        session.rollback()
+        raise AppException(message="Email already exists", status_code=status.HTTP_400_BAD_REQUEST)
+
+    session.commit()
+    return user
 
-def _create(obj: dto.UserCreateDTO, role: enums.UserRole) -> db.UserDb:
+
+async def _create_async(session: AsyncSession, obj: dto.UserCreateDTO, role: enums.UserRole) -> db.UserDb:
+    user_to_db = _prepare_create(obj, role)
+    if await user_repo.email_exists_async(session, user_to_db.email):
+        raise AppException(message="Email already exists", status_code=status.HTTP_400_BAD_REQUEST)
+    user_to_db.password = await bcrypt_hashing.hash_async(obj.password)
+
+    user = await user_repo.add_if_absent_async(session, user_to_db)
+    if user is None:
+        await session.rollback()
+        raise AppException(message="Email already exists", status_code=status.HTTP_400_BAD_REQUEST)
+
+    await session.commit()
+    return user
+
+
+def _prepare_create(obj: dto.UserCreateDTO, role: enums.UserRole) -> db.UserDb:
+    """Validate the create payload and build the row, without password hash."""
     name_formatted = formatting.format_string(obj.name)
     surname_formatted = formatting.format_string(obj.surname)
     email_formatted = formatting.format_string(obj.email)
@@ -94,27 +346,23 @@ def _create(obj: dto.UserCreateDTO, role: enums.UserRole) -> db.UserDb:
     if email_formatted == "":
         raise AppException(message="Email is not valid", status_code=status.HTTP_400_BAD_REQUEST)
 
-    if user_repo.get_by_email(email_formatted) is not None:
-        raise AppException(message="Email already exists", status_code=status.HTTP_400_BAD_REQUEST)
-
     user_to_db = db.UserDb()
     user_to_db.name = name_formatted
     user_to_db.surname = surname_formatted
     user_to_db.role = role
     user_to_db.email = email_formatted
-    user_to_db.password = bcrypt_hashing.hash(obj.password)
 
-    return user_repo.add(user_to_db)
+    return user_to_db
 
 
-def _update_password(user: db.UserDb, new_password: str) -> None:
-    new_pass_hash = bcrypt_hashing.hash(new_password)
+def _update_password(session: Session, user: db.UserDb, new_password: str) -> None:
+    new_pass_hash = bcrypt_hashing.hash_blocking(new_password)
     user.password = new_pass_hash
-    user_repo.update(user)
+    user_repo.update(session, user)
 
 
-def _reset_password(user: db.UserDb) -> str:
+def _reset_password(session: Session, user: db.UserDb) -> str:
     new_password = str(randint(MIN_PASS, MAX_PASS))
-    _update_password(user, new_password)
+    _update_password(session, user, new_password)
 
     return new_password
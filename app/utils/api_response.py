@@ -1,5 +1,17 @@
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+# Built once: serializes the envelope and any pydantic models / lists / datetimes
+# inside `data` straight to JSON bytes in a single pass (no jsonable_encoder + json.dumps).
+_envelope_adapter = TypeAdapter(dict[str, Any])
+
+
+class RawJSONResponse(Response):
+    """JSON response whose body is already encoded bytes."""
+    media_type = "application/json"
 
 
 class ApiResponse:
@@ -9,10 +21,10 @@ class ApiResponse:
             "code": status,
             "status": "success",
             "message": message,
-            "data": jsonable_encoder(data),
+            "data": data,
         }
         response.update(kwargs)
-        return JSONResponse(content=response, status_code=status)
+        return ApiResponse._render(response, status)
 
     @staticmethod
     def error(message="Thất bại", status=400, errors=None):
@@ -22,5 +34,9 @@ class ApiResponse:
             "message": message,
         }
         if errors:
-            response["errors"] = jsonable_encoder(errors)
-        return JSONResponse(content=response, status_code=status)
\ No newline at end of file
+            response["errors"] = errors
+        return ApiResponse._render(response, status)
+
+    @staticmethod
+    def _render(response: dict, status: int) -> RawJSONResponse:
+        return RawJSONResponse(content=_envelope_adapter.dump_json(response), status_code=status)
@@ -0,0 +1,55 @@
+from typing import Iterable, Iterator
+
+
+class Bitmap:
+    """
+    Set of non-negative ints stored as the bits of one Python int.
+    Dense id ranges cost ~1 bit per id, and AND / OR run in C over machine words.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def of(cls, values: Iterable[int]) -> "Bitmap":
+        """Built in one go from a byte buffer: `add` in a loop would copy the whole int every time."""
+        values = list(values)
+        if not values:
+            return cls()
+        buffer = bytearray(max(values) // 8 + 1)
+        for value in values:
+            buffer[value >> 3] |= 1 << (value & 7)
+        return cls(int.from_bytes(buffer, "little"))
+
+    def add(self, value: int) -> None:
+        self.bits |= 1 << value
+
+    def discard(self, value: int) -> None:
+        self.bits &= ~(1 << value)
+
+    def __contains__(self, value: int) -> bool:
+        return (self.bits >> value) & 1 == 1
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & other.bits)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits | other.bits)
+
+    def iter_after(self, after: int | None = None) -> Iterator[int]:
+        """Set values in ascending order, strictly greater than `after`."""
+        start = 0 if after is None else after + 1
+        bits = self.bits >> start
+        while bits:
+            low = bits & -bits
+            value = low.bit_length() - 1
+            yield start + value
+            bits ^= low
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from starlette import status
+
+from app.core.config import CONFIG
+from app.exceptions.scheme import AppException
+
+
+def clamp_limit(limit: int) -> int:
+    """Server-side cap for every page, whatever the client asks for."""
+    return min(limit, CONFIG.MAX_PAGE_SIZE)
+
+
+def encode_cursor(order_by: str, value: Any, last_id: int) -> str:
+    """Opaque keyset cursor: the sort key and id of the last row of a page."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"k": order_by, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _load(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(data, dict):
+            raise ValueError("cursor is not an object")
+        return data
+    except (binascii.Error, UnicodeError, ValueError):
+        raise AppException(message="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST)
+
+
+def cursor_order_by[T: StrEnum](cursor: str, choices: type[T]) -> T:
+    """The ordering a cursor was issued for, so clients may send the cursor back without repeating it."""
+    try:
+        return choices(_load(cursor)["k"])
+    except (KeyError, TypeError, ValueError):
+        raise AppException(message="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST)
+
+
+def decode_cursor(cursor: str, order_by: str) -> tuple[Any, int]:
+    """Returns (sort value, last id). Raises 400 for foreign or tampered cursors."""
+    data = _load(cursor)
+    try:
+        if data["k"] != order_by:
+            raise ValueError("cursor was issued for another ordering")
+        value = data["v"]
+        if order_by == "created_at":
+            value = datetime.fromisoformat(value)
+        return value, int(data["id"])
+    except (KeyError, TypeError, ValueError):
+        raise AppException(message="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Hashable
+
+
+class TokenBuckets:
+    """
+    Token bucket per key (`capacity` tokens, refilled at `refill_per_second`) in a bounded table.
+
+    A bucket left alone until it is full again is indistinguishable from a new one, so it is
+    dropped then. Expiry runs on a hashed timing wheel: every key sits in the slot of the tick
+    at which it will be full, and moving the clock forward clears whole slots. No scans, and
+    memory follows the number of keys seen during the last refill period, capped at `maxsize`
+    (beyond it the bucket closest to expiry is evicted).
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, maxsize: int, slots: int = 64):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.maxsize = maxsize
+        self._slot_count = slots
+        # the longest life (empty -> full) spans slots - 1 ticks, so a key never wraps around the wheel
+        self._tick_seconds = capacity / refill_per_second / (slots - 1)
+        self._slots: list[set] = [set() for _ in range(slots)]
+        self._buckets: dict[Hashable, tuple[float, float, int]] = {}  # key -> (tokens, updated_at, expiry tick)
+        self._tick = int(time.monotonic() // self._tick_seconds)
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.evictions = 0
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> bool:
+        """Takes `cost` tokens from the bucket of `key`. False (nothing taken) when there aren't enough."""
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.capacity
+                if len(self._buckets) >= self.maxsize:
+                    self._evict_one()
+            else:
+                tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+                self._slots[bucket[2] % self._slot_count].discard(key)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            else:
+                self.rejected += 1
+
+            full_at = now + (self.capacity - tokens) / self.refill_per_second
+            expiry = int(full_at // self._tick_seconds) + 1
+            self._buckets[key] = (tokens, now, expiry)
+            self._slots[expiry % self._slot_count].add(key)
+            return allowed
+
+    def _advance(self, now: float) -> None:
+        current = int(now // self._tick_seconds)
+        if current <= self._tick:
+            return
+        # after a long idle period every slot is cleared exactly once
+        for tick in range(max(self._tick + 1, current - self._slot_count + 1), current + 1):
+            slot = self._slots[tick % self._slot_count]
+            for key in slot:
+                del self._buckets[key]
+            slot.clear()
+        self._tick = current
+
+    def _evict_one(self) -> None:
+        for offset in range(1, self._slot_count + 1):
+            slot = self._slots[(self._tick + offset) % self._slot_count]
+            if slot:
+                del self._buckets[slot.pop()]
+                self.evictions += 1
+                return
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._buckets),
+                "maxsize": self.maxsize,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+            }
@@ -3,25 +3,27 @@ from datetime import datetime
 from fastapi.requests import Request
 from app.models.dto import UserDTO
 from app.core.templates import templates
+from app.core.templates import cached_response
 
 
 def main_page(req: Request):
     now = datetime.now()
-    return templates.TemplateResponse(
-        req, "main.jinja", {"date": now.replace(microsecond=0)}
+    return cached_response(
+        req, "main.jinja", {"date": now.replace(microsecond=0)}, volatile=("date",)
     )
 
 def register_page(req: Request, error: str = None, success: str = None):
     now = datetime.now()
-    return templates.TemplateResponse(
+    return cached_response(
         req, "register.jinja", {
             "date": now.replace(microsecond=0),
             "error": error,
             "success": success
-        }
+        },
+        volatile=("date",),
     )
 
 def auth_page(req: Request, user: UserDTO):
     return templates.TemplateResponse(
         req, "auth.jinja", {"user": user}
-    )
\ No newline at end of file
+    )
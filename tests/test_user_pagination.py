@@ -0,0 +1,41 @@
+"""
+Keyset pagination of users ordered by created_at on SQLite, where CURRENT_TIMESTAMP is
+stored as second-precision text and several rows share the cursor's second.
+
+Run with `python -m pytest tests`.
+"""
+import os
+import tempfile
+
+# a throwaway database, never the one configured in the environment
+os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{tempfile.mkdtemp()}/pagination.db"
+os.environ.pop("ASYNC_DB_CONNECTION_STRING", None)
+
+from sqlalchemy import text
+
+from app.core.db_context import create_tables
+from app.core.db_context import engine
+from app.core.db_context import session_maker
+from app.models.enums import UserOrder
+from app.services import user as user_service
+
+
+def test_created_at_page_two_on_shared_second():
+    create_tables()
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM users"))
+        for i in range(5):
+            # server default, so every row gets the same 'YYYY-MM-DD HH:MM:SS' text
+            connection.execute(
+                text("INSERT INTO users (name, surname, role, email, password) VALUES (:n, 'S', 'USER', :e, 'x')"),
+                {"n": f"user{i}", "e": f"user{i}@example.com"},
+            )
+
+    with session_maker() as session:
+        first, cursor = user_service.get_page(session, order_by=UserOrder.CREATED_AT, limit=2)
+        second, cursor = user_service.get_page(session, cursor, limit=2)
+        third, cursor = user_service.get_page(session, cursor, limit=2)
+
+    ids = [user.id for user in first + second + third]
+    assert ids == sorted(ids) and len(ids) == 5
+    assert cursor is None